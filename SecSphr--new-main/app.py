@@ -1,11 +1,24 @@
 import os
+import re
+import sys
 import csv
-from flask import Flask, render_template, redirect, url_for, request, flash, session, jsonify
+import hashlib
+import json
+import marshal
+import queue
+import threading
+import time
+from flask import Flask, Response, stream_with_context, render_template, redirect, url_for, request, flash, session, jsonify, g, has_app_context
+from flask import before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.engine import Engine
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from functools import wraps
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 # Add import for generating random tokens
@@ -17,7 +30,7 @@ app.secret_key = os.environ.get('SECRET_KEY', 'supersecretkey-change-in-producti
 
 # Database Configuration - Professional Setup
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "instance", "securesphere.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "securesphere.db")}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_timeout': 20,
@@ -25,6 +38,12 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
     'pool_pre_ping': True
 }
 app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'static', 'uploads')
+app.config['QUESTIONNAIRE_ARTIFACT'] = os.environ.get('QUESTIONNAIRE_ARTIFACT', os.path.join(basedir, 'instance', 'questionnaire.bin'))
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # Bearer token for /metrics scrapers; unset means superusers only
+app.config['QUERY_BUDGET_MODE'] = os.environ.get('QUERY_BUDGET_MODE', 'off')  # off, warn or raise
+# Open notification streams per process and per user; each holds a worker thread on the threaded server
+app.config['SSE_MAX_STREAMS'] = int(os.environ.get('SSE_MAX_STREAMS', 32))
+app.config['SSE_MAX_STREAMS_PER_USER'] = int(os.environ.get('SSE_MAX_STREAMS_PER_USER', 2))
 ALLOWED_EXTENSIONS = {'csv', 'txt', 'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx', 'xlsx', 'zip'}
 
 # Email Configuration
@@ -96,6 +115,7 @@ class Product(db.Model):
     responses = db.relationship('QuestionnaireResponse', backref='product', lazy=True, cascade='all, delete-orphan')
     statuses = db.relationship('ProductStatus', backref='product', lazy=True, cascade='all, delete-orphan')
     scores = db.relationship('ScoreHistory', backref='product', lazy=True, cascade='all, delete-orphan')
+    aggregates = db.relationship('AssessmentAggregate', backref='product', lazy=True, cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Product {self.name}>'
@@ -118,6 +138,32 @@ class ProductStatus(db.Model):
     def __repr__(self):
         return f'<ProductStatus {self.product_id}-{self.user_id}: {self.status}>'
 
+class QuestionnaireQuestion(db.Model):
+    """Catalog of every question text the questionnaire has served, under a stable integer id"""
+    __tablename__ = 'questionnaire_questions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.Text, nullable=False, unique=True)
+    dimension = db.Column(db.String(100))  # Dimension the question was first seen under
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<QuestionnaireQuestion {self.id}>'
+
+class QuestionnaireOption(db.Model):
+    """Catalog of every answer option of a catalog question, under a stable integer id"""
+    __tablename__ = 'questionnaire_options'
+
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questionnaire_questions.id'), nullable=False)
+    label = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (db.UniqueConstraint('question_id', 'label', name='uq_option_question_label'),)
+
+    def __repr__(self):
+        return f'<QuestionnaireOption {self.id}: {self.question_id}>'
+
 class QuestionnaireResponse(db.Model):
     __tablename__ = 'questionnaire_responses'
 
@@ -127,7 +173,9 @@ class QuestionnaireResponse(db.Model):
     section = db.Column(db.String(100), nullable=False)
     question = db.Column(db.Text, nullable=False)
     question_index = db.Column(db.Integer)  # For ordering
+    question_id = db.Column(db.Integer, db.ForeignKey('questionnaire_questions.id'))  # Catalog id of question
     answer = db.Column(db.String(500))
+    option_id = db.Column(db.Integer, db.ForeignKey('questionnaire_options.id'))  # Catalog id of answer, null for free text
     client_comment = db.Column(db.Text)
     evidence_path = db.Column(db.String(500))
     score = db.Column(db.Integer, default=0)
@@ -150,6 +198,28 @@ class QuestionnaireResponse(db.Model):
     def __repr__(self):
         return f'<Response {self.id}: {self.section}>'
 
+class QuestionnaireDraft(db.Model):
+    """Autosaved answer and comment for one question, kept apart from the submitted response until the section is submitted"""
+    __tablename__ = 'questionnaire_drafts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    section = db.Column(db.String(100), nullable=False)
+    question_index = db.Column(db.Integer, nullable=False)
+    question = db.Column(db.Text, nullable=False)  # Drafts for a question the CSV has since changed are ignored
+    answer = db.Column(db.String(500))
+    client_comment = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # One draft per question of an assessment, read by section
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'user_id', 'section', 'question_index', name='uq_draft_question'),
+    )
+
+    def __repr__(self):
+        return f'<QuestionnaireDraft {self.product_id}-{self.section}-{self.question_index}>'
+
 class LeadComment(db.Model):
     __tablename__ = 'lead_comments'
 
@@ -161,12 +231,14 @@ class LeadComment(db.Model):
     comment = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='pending')  # pending, approved, needs_revision, rejected, client_reply
     parent_comment_id = db.Column(db.Integer, db.ForeignKey('lead_comments.id'), nullable=True)
+    root_id = db.Column(db.Integer, db.ForeignKey('lead_comments.id'), nullable=True)  # First comment of the conversation, null on that comment itself
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationships
-    parent_comment = db.relationship('LeadComment', remote_side=[id], backref='replies')
+    parent_comment = db.relationship('LeadComment', remote_side=[id], foreign_keys=[parent_comment_id], backref='replies')
+    root = db.relationship('LeadComment', remote_side=[id], foreign_keys=[root_id])
     lead = db.relationship('User', foreign_keys=[lead_id], backref='lead_comments_made')
     client = db.relationship('User', foreign_keys=[client_id], backref='lead_comments_received')
     product = db.relationship('Product', backref='lead_comments')
@@ -175,6 +247,10 @@ class LeadComment(db.Model):
     __table_args__ = (
         db.Index('idx_client_read', 'client_id', 'is_read'),
         db.Index('idx_status', 'status'),
+        db.Index('idx_client_inbox', 'client_id', 'created_at', 'id'),
+        db.Index('idx_lead_inbox', 'lead_id', 'created_at', 'id'),
+        db.Index('idx_parent_comment', 'parent_comment_id'),
+        db.Index('idx_thread_root', 'root_id', 'created_at'),
     )
 
     def __repr__(self):
@@ -200,6 +276,41 @@ class ScoreHistory(db.Model):
     def __repr__(self):
         return f'<ScoreHistory {self.product_id}-{self.section_name}: {self.percentage}%>'
 
+class AssessmentAggregate(db.Model):
+    __tablename__ = 'assessment_aggregates'
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    dimension = db.Column(db.String(100), nullable=False)
+    score_sum = db.Column(db.Integer, default=0)  # Sum of 1-5 CSV scores of answered questions
+    answer_count = db.Column(db.Integer, default=0)  # Answered questions
+    response_count = db.Column(db.Integer, default=0)  # All stored responses, answered or not
+    max_score = db.Column(db.Integer, default=0)  # Highest possible score_sum (5 per answered question)
+    maturity = db.Column(db.Float, default=0.0)  # score_sum / answer_count
+    questionnaire_version = db.Column(db.String(64))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # One row per assessment dimension, read by (product, user)
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'user_id', 'dimension', name='uq_aggregate_product_user_dimension'),
+        db.Index('idx_aggregate_user_product', 'user_id', 'product_id'),
+    )
+
+    def __repr__(self):
+        return f'<AssessmentAggregate {self.product_id}-{self.user_id}-{self.dimension}: {self.maturity}>'
+
+class UnreadCounter(db.Model):
+    """Maintained count of unread lead comments addressed to each user"""
+    __tablename__ = 'unread_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<UnreadCounter {self.user_id}: {self.unread_count}>'
+
 class SystemSettings(db.Model):
     __tablename__ = 'system_settings'
 
@@ -346,8 +457,8 @@ def send_invitation_email(email, role, invitation_link, inviter_name):
         print(f"Failed to send email: {str(e)}")
         return False
 
-def load_questionnaire():
-    sections = {}
+def find_questionnaire_csv():
+    """Locate devweb.csv and the encoding it can be read with"""
     # Try different file paths and encodings
     possible_paths = [
         'static/devweb.csv',
@@ -359,29 +470,26 @@ def load_questionnaire():
     
     possible_encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
     
-    csv_file = None
-    encoding_used = None
-    
     # Try to find the file with different paths and encodings
     for file_path in possible_paths:
         if os.path.exists(file_path):
             for encoding in possible_encodings:
                 try:
                     with open(file_path, 'r', encoding=encoding) as f:
-                        # Test if we can read the first line
-                        first_line = f.readline()
-                        f.seek(0)  # Reset file pointer
                         reader = csv.DictReader(f)
                         # Test if we can read the header
                         fieldnames = reader.fieldnames
                         if fieldnames and 'Dimensions' in fieldnames:
-                            csv_file = file_path
-                            encoding_used = encoding
-                            break
-                except (UnicodeDecodeError, UnicodeError):
+                            return file_path, encoding
+                except (UnicodeDecodeError, UnicodeError, csv.Error):
                     continue
-            if csv_file:
-                break
+    
+    return None, None
+
+def load_questionnaire(csv_file=None, encoding_used=None):
+    sections = {}
+    if not csv_file:
+        csv_file, encoding_used = find_questionnaire_csv()
     
     if not csv_file:
         print("Warning: CSV file not found or unreadable. Using fallback questionnaire.")
@@ -509,9 +617,810 @@ def get_fallback_questionnaire():
         ]
     }
 
+def build_scoring_index(csv_file=None, encoding_used=None):
+    """Compile devweb.csv once into constant-time scoring lookups"""
+    scoring_index = {
+        'option_scores': {},        # (dimension, question, option) -> score
+        'question_options': {},     # question -> {option: score}
+        'max_scores': {},           # question -> highest option score
+        'question_dimensions': {},  # question -> dimension
+        'dimensions': []            # dimensions in CSV order
+    }
+
+    if not csv_file:
+        csv_file, encoding_used = find_questionnaire_csv()
+    if not csv_file:
+        print("Warning: CSV file not found or unreadable. Scoring falls back to option letters.")
+        return scoring_index
+
+    try:
+        with open(csv_file, 'r', encoding=encoding_used) as f:
+            reader = csv.DictReader(f)
+            current_dimension = None
+            current_question = None
+
+            for row in reader:
+                dimension = (row.get('Dimensions') or '').strip()
+                question = (row.get('Questions') or '').strip()
+                option = (row.get('Options') or '').strip()
+                score_text = (row.get('Scores') or '').strip()
+
+                if dimension:
+                    current_dimension = dimension
+                    if dimension not in scoring_index['dimensions']:
+                        scoring_index['dimensions'].append(dimension)
+                if question:
+                    current_question = question
+                    scoring_index['question_dimensions'].setdefault(question, current_dimension)
+
+                if not (current_question and option and score_text):
+                    continue
+                try:
+                    score = int(score_text)
+                except (ValueError, TypeError):
+                    continue
+
+                # First occurrence wins, matching the original top-to-bottom CSV scan
+                scoring_index['option_scores'].setdefault((current_dimension, current_question, option), score)
+                scoring_index['question_options'].setdefault(current_question, {}).setdefault(option, score)
+
+        for question, options in scoring_index['question_options'].items():
+            scoring_index['max_scores'][question] = max(options.values())
+    except Exception as e:
+        print(f"Error building scoring index: {e}")
+
+    return scoring_index
+
+def hash_questionnaire_file(csv_file):
+    """Hash of the raw questionnaire CSV; tells whether the file needs recompiling"""
+    with open(csv_file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def questionnaire_version(sections, scoring):
+    """Version id from the parsed content that affects answers and scores.
+
+    Whitespace, encoding and description edits leave it unchanged, so caches and aggregates stay valid.
+    """
+    content = {
+        'sections': [[section, [[question['question'], question['options']] for question in questions]]
+                     for section, questions in sections.items()],
+        'dimensions': scoring['dimensions'],
+        'option_scores': sorted([dimension or '', question, option, score]
+                                for (dimension, question, option), score in scoring['option_scores'].items())
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+QUESTIONNAIRE_ARTIFACT_MAGIC = b'SSQ2'  # Bumped when the snapshot format or version scheme changes
+QUESTIONNAIRE_ARTIFACT_FIELDS = ('version', 'content_hash', 'source', 'encoding', 'sections',
+                                 'section_ids', 'total_questions', 'scoring')
+
+def write_questionnaire_artifact(snapshot, artifact_path):
+    """Write a compiled questionnaire snapshot as a compact binary artifact"""
+    payload = {field: snapshot[field] for field in QUESTIONNAIRE_ARTIFACT_FIELDS}
+    # Store the source relative to the app so the artifact survives deployment to another path
+    payload['source'] = os.path.relpath(snapshot['source'], basedir)
+    os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+    temp_path = f"{artifact_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(QUESTIONNAIRE_ARTIFACT_MAGIC)
+        f.write(marshal.dumps(payload))
+    os.replace(temp_path, artifact_path)
+
+def load_questionnaire_artifact(artifact_path):
+    """Load a compiled questionnaire artifact, or None if it is missing, unreadable or stale"""
+    try:
+        with open(artifact_path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(QUESTIONNAIRE_ARTIFACT_MAGIC):
+            return None
+        snapshot = marshal.loads(data[len(QUESTIONNAIRE_ARTIFACT_MAGIC):])
+        if not isinstance(snapshot, dict) or any(field not in snapshot for field in QUESTIONNAIRE_ARTIFACT_FIELDS):
+            return None
+
+        # Only trust the artifact while it matches the CSV it was built from
+        source = os.path.join(basedir, snapshot['source']) if snapshot['source'] else None
+        if not source or not os.path.exists(source):
+            return None
+        snapshot['source'] = source
+        snapshot['mtime'] = os.path.getmtime(source)
+        if hash_questionnaire_file(source) != snapshot['content_hash']:
+            print("Questionnaire artifact is stale; compiling from CSV. Run compile_questionnaire.py to rebuild it.")
+            return None
+        return snapshot
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+def index_questions(sections):
+    """section -> {question text: position in the section}; the first of duplicate texts wins"""
+    question_indexes = {}
+    for section, questions in sections.items():
+        positions = question_indexes[section] = {}
+        for i, question in enumerate(questions):
+            positions.setdefault(question['question'], i)
+    return question_indexes
+
+def compile_questionnaire(use_artifact=True):
+    """Compile devweb.csv into a versioned, read-only questionnaire snapshot"""
+    if use_artifact:
+        snapshot = load_questionnaire_artifact(app.config['QUESTIONNAIRE_ARTIFACT'])
+        if snapshot:
+            snapshot['question_indexes'] = index_questions(snapshot['sections'])
+            return snapshot
+
+    csv_file, encoding_used = find_questionnaire_csv()
+    content_hash = None
+    mtime = None
+    if csv_file:
+        try:
+            csv_file = os.path.abspath(csv_file)
+            mtime = os.path.getmtime(csv_file)
+            content_hash = hash_questionnaire_file(csv_file)
+        except OSError as e:
+            print(f"Warning: Could not hash questionnaire file: {e}")
+            csv_file = None
+
+    sections = load_questionnaire(csv_file, encoding_used)
+    scoring = build_scoring_index(csv_file, encoding_used)
+    return {
+        'version': questionnaire_version(sections, scoring) if content_hash else 'fallback',
+        'content_hash': content_hash,
+        'source': csv_file,
+        'encoding': encoding_used,
+        'mtime': mtime,
+        'sections': sections,
+        'section_ids': list(sections.keys()),
+        'total_questions': sum(len(questions) for questions in sections.values()),
+        'question_indexes': index_questions(sections),
+        'scoring': scoring
+    }
+
+class QuestionnaireRegistry:
+    """Serves the compiled questionnaire and swaps in a new version when devweb.csv changes"""
+
+    def __init__(self, check_interval=2.0):
+        self._lock = threading.Lock()
+        self._check_interval = check_interval
+        self._last_check = time.monotonic()
+        self._current = compile_questionnaire()
+
+    def current(self):
+        """Return the latest compiled snapshot; never waits on a reload in progress"""
+        now = time.monotonic()
+        if now - self._last_check >= self._check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._last_check = now
+                self._reload_if_changed()
+            finally:
+                self._lock.release()
+        return self._current
+
+    def _reload_if_changed(self):
+        snapshot = self._current
+        csv_file = snapshot['source']
+        try:
+            if csv_file and os.path.getmtime(csv_file) == snapshot['mtime']:
+                return
+            if csv_file and hash_questionnaire_file(csv_file) == snapshot['content_hash']:
+                # Touched but unchanged - keep the version, remember the new mtime
+                self._current = dict(snapshot, mtime=os.path.getmtime(csv_file))
+                return
+        except OSError:
+            pass
+
+        try:
+            compiled = compile_questionnaire()
+        except Exception as e:
+            print(f"Error reloading questionnaire, keeping version {snapshot['version']}: {e}")
+            return
+
+        if compiled['version'] != snapshot['version']:
+            print(f"Questionnaire reloaded: version {snapshot['version']} -> {compiled['version']}")
+        elif compiled['content_hash'] != snapshot['content_hash']:
+            print(f"Questionnaire reloaded: content unchanged, keeping version {compiled['version']}")
+        # Single reference assignment, so readers see either the old or the new snapshot
+        self._current = compiled
+
 # Load questionnaire data
-QUESTIONNAIRE = load_questionnaire()
-SECTION_IDS = list(QUESTIONNAIRE.keys())
+app.config['QUESTIONNAIRE_RELOAD_INTERVAL'] = float(os.environ.get('QUESTIONNAIRE_RELOAD_INTERVAL', 2))
+questionnaire_registry = QuestionnaireRegistry(app.config['QUESTIONNAIRE_RELOAD_INTERVAL'])
+
+def current_questionnaire():
+    """Questionnaire snapshot for the current request, pinned so it cannot change mid-request"""
+    if has_app_context():
+        if 'questionnaire' not in g:
+            g.questionnaire = questionnaire_registry.current()
+        return g.questionnaire
+    return questionnaire_registry.current()
+
+@app.after_request
+def add_questionnaire_version_header(response):
+    """Expose the questionnaire version so cached pages and scores can be invalidated per version"""
+    if 'questionnaire' in g:
+        response.headers['X-Questionnaire-Version'] = g.questionnaire['version']
+    return response
+
+# Question catalog
+class QuestionCatalog:
+    """Integer ids for questionnaire questions and options, plus the current version's scores keyed by them.
+
+    Ids are stored in questionnaire_questions / questionnaire_options and never change, so
+    responses keep referencing them across questionnaire versions. The first request on a new
+    version adds its unseen texts to the catalog and swaps in a fresh lookup snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+
+    def get(self, questionnaire):
+        """Lookups for this questionnaire version, or None while it has not been synced"""
+        current = self._current
+        if current is not None and current['version'] == questionnaire['version']:
+            return current
+        return None
+
+    def sync(self, questionnaire):
+        """Catalog the version's questions and options if needed and return its lookups"""
+        current = self.get(questionnaire)
+        if current is not None:
+            return current
+        with self._lock:
+            current = self.get(questionnaire)
+            if current is None:
+                # Single reference assignment, like the questionnaire registry
+                current = self._current = self._build(questionnaire)
+        return current
+
+    def _build(self, questionnaire):
+        scoring = questionnaire['scoring']
+        question_dimensions = {}
+        question_options = {}
+        for section, questions in questionnaire['sections'].items():
+            for question in questions:
+                question_dimensions.setdefault(question['question'], section)
+                question_options.setdefault(question['question'], set()).update(question['options'])
+        for question, options in scoring['question_options'].items():
+            question_dimensions.setdefault(question, scoring['question_dimensions'].get(question))
+            question_options.setdefault(question, set()).update(options)
+
+        # Own connection and transaction, so a request's rollback cannot drop ids this snapshot hands out
+        questions = QuestionnaireQuestion.__table__
+        options = QuestionnaireOption.__table__
+        with db.engine.begin() as connection:
+            def load_question_ids():
+                return dict(connection.execute(db.select(questions.c.text, questions.c.id)).all())
+
+            def load_option_ids():
+                return {(question_id, label): option_id for option_id, question_id, label in
+                        connection.execute(db.select(options.c.id, options.c.question_id, options.c.label))}
+
+            question_ids = load_question_ids()
+            missing = [{'text': text, 'dimension': dimension}
+                       for text, dimension in question_dimensions.items() if text not in question_ids]
+            if missing:
+                connection.execute(questions.insert(), missing)
+                question_ids = load_question_ids()
+
+            option_ids = load_option_ids()
+            missing = [{'question_id': question_ids[question], 'label': label}
+                       for question, labels in question_options.items()
+                       for label in labels if (question_ids[question], label) not in option_ids]
+            if missing:
+                connection.execute(options.insert(), missing)
+                option_ids = load_option_ids()
+
+        def option_id(question, label):
+            return option_ids[(question_ids[question], label)]
+
+        return {
+            'version': questionnaire['version'],
+            'question_ids': question_ids,  # question text -> id
+            'option_ids': option_ids,      # (question id, option label) -> id
+            'option_scores': {option_id(question, label): score              # option id -> score
+                              for question, labels in scoring['question_options'].items()
+                              for label, score in labels.items()},
+            'dimension_option_scores': {(dimension, option_id(question, label)): score  # (dimension, option id) -> score
+                                        for (dimension, question, label), score in scoring['option_scores'].items()},
+            'max_scores': {question_ids[question]: score                    # question id -> highest option score
+                           for question, score in scoring['max_scores'].items()}
+        }
+
+question_catalog = QuestionCatalog()
+
+# Lookups used while the catalog is not synced: every response falls back to text scoring
+EMPTY_CATALOG_SCORES = {'option_scores': {}, 'dimension_option_scores': {}, 'max_scores': {}}
+
+@app.before_request
+def sync_question_catalog():
+    """Catalog the questionnaire version this request is pinned to before anything is scored or saved"""
+    if request.endpoint == 'static':
+        return
+    try:
+        question_catalog.sync(current_questionnaire())
+    except Exception as e:
+        print(f"⚠️ Warning: Could not sync question catalog: {e}")
+
+@event.listens_for(Session, 'before_flush')
+def assign_catalog_ids(session, flush_context, instances):
+    """Point new and edited responses at the catalog ids of their question and answer"""
+    catalog = question_catalog.get(current_questionnaire())
+    if catalog is None:
+        # Not synced yet; ensure_question_catalog() links these rows later
+        return
+    with session.no_autoflush:
+        for response in list(session.new) + list(session.dirty):
+            if not isinstance(response, QuestionnaireResponse):
+                continue
+            if response not in session.new:
+                attrs = inspect(response).attrs
+                if not (attrs.question.history.has_changes() or attrs.answer.history.has_changes()):
+                    continue
+            # Texts the catalog has never seen keep whatever id they already had
+            question_id = catalog['question_ids'].get(response.question, response.question_id)
+            response.question_id = question_id
+            response.option_id = catalog['option_ids'].get((question_id, response.answer))
+
+# Request metrics
+METRIC_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRIC_STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class RequestMetrics:
+    """Histograms per endpoint and role, rendered in the Prometheus text format"""
+
+    HISTOGRAMS = {
+        'securesphere_request_duration_seconds': ('Total time spent handling the request', METRIC_LATENCY_BUCKETS),
+        'securesphere_db_duration_seconds': ('Time spent executing SQL statements', METRIC_LATENCY_BUCKETS),
+        'securesphere_render_duration_seconds': ('Time spent rendering templates', METRIC_LATENCY_BUCKETS),
+        'securesphere_db_statements': ('SQL statements issued by the request', METRIC_STATEMENT_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (metric, endpoint, role) -> cumulative bucket counts + [sum, count]
+
+    def observe(self, endpoint, role, values):
+        with self._lock:
+            for metric, value in values.items():
+                buckets = self.HISTOGRAMS[metric][1]
+                series = self._series.get((metric, endpoint, role))
+                if series is None:
+                    series = self._series[(metric, endpoint, role)] = [0] * len(buckets) + [0, 0]
+                for i, bound in enumerate(buckets):
+                    if value <= bound:
+                        series[i] += 1
+                series[-2] += value
+                series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+
+        lines = []
+        for metric, (help_text, buckets) in self.HISTOGRAMS.items():
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (name, endpoint, role), series in sorted(snapshot.items()):
+                if name != metric:
+                    continue
+                labels = f'endpoint="{endpoint}",role="{role}"'
+                for bound, count in zip(buckets, series):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+                lines.append(f'{metric}_sum{{{labels}}} {series[-2]}')
+                lines.append(f'{metric}_count{{{labels}}} {series[-1]}')
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and 'request_metrics' in g:
+        metrics = g.request_metrics
+        metrics['statements'] += 1
+        started = getattr(context, 'metrics_started', None)
+        if started is not None:
+            metrics['db_time'] += time.perf_counter() - started
+    if has_app_context() and 'query_log' in g:
+        g.query_log.append((statement_fingerprint(statement), statement_call_site()))
+
+@before_render_template.connect_via(app)
+def start_render_timer(sender, template, context, **extra):
+    if 'request_metrics' in g:
+        g.request_metrics['render_started'] = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def record_render_time(sender, template, context, **extra):
+    # Lazy loads triggered from a template count towards both render and DB time
+    metrics = g.get('request_metrics')
+    if metrics and metrics.get('render_started') is not None:
+        metrics['render_time'] += time.perf_counter() - metrics.pop('render_started')
+
+@app.before_request
+def start_request_metrics():
+    g.request_metrics = {'started': time.perf_counter(), 'statements': 0, 'db_time': 0.0, 'render_time': 0.0}
+
+@app.teardown_request
+def observe_request_metrics(exc):
+    metrics = g.pop('request_metrics', None)
+    if metrics is None or request.endpoint in ('metrics', 'static'):
+        return
+    request_metrics.observe(request.endpoint or 'unmatched', session.get('role', 'anonymous'), {
+        'securesphere_request_duration_seconds': time.perf_counter() - metrics['started'],
+        'securesphere_db_duration_seconds': metrics['db_time'],
+        'securesphere_render_duration_seconds': metrics['render_time'],
+        'securesphere_db_statements': metrics['statements']
+    })
+
+# Query budgets
+class QueryBudgetExceeded(Exception):
+    """Raised in QUERY_BUDGET_MODE=raise when a route issues more SQL statements than it declared"""
+
+def statement_fingerprint(statement):
+    """SQL text with literals and IN-lists collapsed, so per-row repeats of a query group together"""
+    fingerprint = re.sub(r"'(?:[^']|'')*'", '?', statement)
+    fingerprint = re.sub(r'\b\d+\b', '?', fingerprint)
+    fingerprint = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', fingerprint)
+    return ' '.join(fingerprint.split())
+
+def statement_call_site(depth=4):
+    """Innermost application frames (app code and templates) that issued the current statement"""
+    sites = []
+    frame = sys._getframe(2)
+    while frame is not None and len(sites) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(basedir) and 'site-packages' not in filename:
+            lineno = frame.f_lineno
+            template = frame.f_globals.get('__jinja_template__')
+            if template is not None:
+                lineno = template.get_corresponding_lineno(lineno)
+            sites.append(f'{os.path.relpath(filename, basedir)}:{lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return sites
+
+def query_budget_report(endpoint, budget, query_log):
+    """Statements grouped by fingerprint, most repeated first, with the call site of the first one"""
+    grouped = {}
+    for fingerprint, call_site in query_log:
+        entry = grouped.setdefault(fingerprint, [0, call_site])
+        entry[0] += 1
+
+    lines = [f'❌ Query budget exceeded for {endpoint}: {len(query_log)} statements, budget {budget}']
+    for fingerprint, (count, call_site) in sorted(grouped.items(), key=lambda item: -item[1][0]):
+        lines.append(f'  {count}x {fingerprint[:300]}')
+        lines.extend(f'      at {site}' for site in call_site)
+    return '\n'.join(lines)
+
+def query_budget(limit=None, **role_limits):
+    """Declare the most SQL statements a route may issue, optionally per session role.
+
+    Only checked when QUERY_BUDGET_MODE is warn (print the report) or raise (also fail the request).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            mode = app.config.get('QUERY_BUDGET_MODE', 'off')
+            budget = role_limits.get(session.get('role'), limit)
+            if mode == 'off' or budget is None:
+                return f(*args, **kwargs)
+
+            g.query_log = []
+            try:
+                result = f(*args, **kwargs)
+            finally:
+                query_log = g.pop('query_log')
+
+            if len(query_log) > budget:
+                report = query_budget_report(request.endpoint, budget, query_log)
+                print(report)
+                if mode == 'raise':
+                    raise QueryBudgetExceeded(report)
+            return result
+        return decorated_function
+    return decorator
+
+# Chat notification fan-out
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 5000
+CLIENT_NOTIFICATION_STATUSES = ['approved', 'needs_revision', 'rejected', 'lead_reply']
+
+class NotificationBroker:
+    """In-process fan-out of chat events to each user's open notification streams.
+
+    A subscriber is a bare SimpleQueue, so idle streams cost one blocked reader each and no DB work.
+    Events only reach streams served by this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of queues
+        self._count = 0
+
+    def subscribe(self, user_id, max_streams=None, max_streams_per_user=None):
+        """New subscription queue, or None when the process or the user is at the stream limit"""
+        subscription = queue.SimpleQueue()
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id, ())
+            if max_streams is not None and self._count >= max_streams:
+                return None
+            if max_streams_per_user is not None and len(subscriptions) >= max_streams_per_user:
+                return None
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self._count -= 1
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+notification_broker = NotificationBroker()
+
+def notification_recipient(status, lead_id, client_id):
+    """User notified about a lead comment: the lead for client replies, the client for reviews"""
+    if status == 'client_reply':
+        return lead_id
+    if status in CLIENT_NOTIFICATION_STATUSES:
+        return client_id
+    return None
+
+def chat_event_recipient(comment):
+    return notification_recipient(comment.status, comment.lead_id, comment.client_id)
+
+@event.listens_for(Session, 'before_flush')
+def assign_thread_roots(session, flush_context, instances):
+    """Stamp new replies with the conversation's first comment so a whole thread loads by root_id"""
+    with session.no_autoflush:
+        for comment in session.new:
+            if not isinstance(comment, LeadComment) or comment.root_id is not None or comment.root is not None:
+                continue
+            parent = comment.parent_comment
+            if parent is None and comment.parent_comment_id is not None:
+                parent = session.get(LeadComment, comment.parent_comment_id)
+            # Ancestors without a root yet are pending in this flush, or rows the backfill has not reached
+            while parent is not None and parent.root_id is None and parent.root is None and parent.parent_comment is not None:
+                parent = parent.parent_comment
+            if parent is None:
+                continue
+            if parent.root_id is not None:
+                comment.root_id = parent.root_id
+            else:
+                comment.root = parent.root or parent
+
+def thread_criteria(*comment_ids):
+    """Every comment, at any depth, of the conversations the given comments belong to"""
+    root_ids = db.session.query(db.func.coalesce(LeadComment.root_id, LeadComment.id)).filter(
+        LeadComment.id.in_(comment_ids)
+    )
+    return db.or_(LeadComment.id.in_(root_ids), LeadComment.root_id.in_(root_ids))
+
+@event.listens_for(Session, 'after_flush')
+def collect_chat_events(session, flush_context):
+    """Queue notification events for comments written in this transaction; sent once it commits"""
+    events = session.info.setdefault('chat_events', [])
+    for comment in session.new:
+        if isinstance(comment, LeadComment):
+            recipient = chat_event_recipient(comment)
+            if recipient is not None:
+                events.append((recipient, ('notification', comment.id)))
+    # Read flags flipped or comments removed only change the recipient's unread count
+    for comment in list(session.dirty) + list(session.deleted):
+        if isinstance(comment, LeadComment):
+            recipient = chat_event_recipient(comment)
+            if recipient is not None and (comment in session.deleted or inspect(comment).attrs.is_read.history.has_changes()):
+                events.append((recipient, ('unread', None)))
+
+@event.listens_for(Session, 'after_commit')
+def publish_chat_events(session):
+    published = set()
+    for user_id, chat_event in session.info.pop('chat_events', []):
+        if (user_id, chat_event) not in published:
+            published.add((user_id, chat_event))
+            notification_broker.publish(user_id, chat_event)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_chat_events(session):
+    session.info.pop('chat_events', None)
+
+# Unread message counters
+def unread_comments_filter(user_id):
+    """Lead comments that count as unread messages for the user, whatever their role"""
+    return db.and_(
+        LeadComment.is_read == False,
+        db.or_(
+            db.and_(LeadComment.client_id == user_id, LeadComment.status.in_(CLIENT_NOTIFICATION_STATUSES)),
+            db.and_(LeadComment.lead_id == user_id, LeadComment.status == 'client_reply')
+        )
+    )
+
+def committed_value(comment, attribute):
+    """Attribute value as of the last flush, for comparing an edited comment with its stored row"""
+    history = inspect(comment).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(comment, attribute)
+
+@event.listens_for(Session, 'after_flush')
+def maintain_unread_counters(session, flush_context):
+    """Apply this flush's unread deltas to the recipients' counters, in the same transaction"""
+    deltas = {}
+
+    def count(recipient, is_read, delta):
+        if recipient is not None and not is_read:
+            deltas[recipient] = deltas.get(recipient, 0) + delta
+
+    for comment in session.new:
+        if isinstance(comment, LeadComment):
+            count(chat_event_recipient(comment), comment.is_read, 1)
+    for comment in session.deleted:
+        if isinstance(comment, LeadComment):
+            count(notification_recipient(*(committed_value(comment, attribute) for attribute in ('status', 'lead_id', 'client_id'))),
+                  committed_value(comment, 'is_read'), -1)
+    for comment in session.dirty:
+        if isinstance(comment, LeadComment) and session.is_modified(comment):
+            count(notification_recipient(*(committed_value(comment, attribute) for attribute in ('status', 'lead_id', 'client_id'))),
+                  committed_value(comment, 'is_read'), -1)
+            count(chat_event_recipient(comment), comment.is_read, 1)
+
+    for user_id, delta in deltas.items():
+        if delta != 0:
+            apply_unread_delta(session.connection(), user_id, delta)
+
+def apply_unread_delta(connection, user_id, delta):
+    """Add delta to the user's unread counter and return the new count"""
+    counters = UnreadCounter.__table__
+    unread_count = connection.execute(counters.update().where(counters.c.user_id == user_id).values(
+        unread_count=counters.c.unread_count + delta,
+        updated_at=datetime.now(timezone.utc)
+    ).returning(counters.c.unread_count)).scalar()
+    if unread_count is None:
+        # First counter for this user: count the rows, which already include the change
+        unread_count = connection.execute(
+            db.select(db.func.count(LeadComment.id)).where(unread_comments_filter(user_id))
+        ).scalar()
+        connection.execute(counters.insert().values(user_id=user_id, unread_count=unread_count,
+                                                    updated_at=datetime.now(timezone.utc)))
+    return unread_count
+
+def rebuild_unread_counters():
+    """Backfill every user's unread counter from lead_comments"""
+    recipient = db.case(
+        (LeadComment.status == 'client_reply', LeadComment.lead_id),
+        (LeadComment.status.in_(CLIENT_NOTIFICATION_STATUSES), LeadComment.client_id),
+        else_=None
+    )
+    unread = dict(db.session.query(recipient, db.func.count(LeadComment.id)).filter(
+        LeadComment.is_read == False
+    ).group_by(recipient).all())
+
+    counters = {counter.user_id: counter for counter in UnreadCounter.query.all()}
+    user_ids = [row.id for row in db.session.query(User.id)]
+    for user_id in user_ids:
+        counter = counters.get(user_id)
+        if counter is None:
+            db.session.add(UnreadCounter(user_id=user_id, unread_count=unread.get(user_id, 0)))
+        elif counter.unread_count != unread.get(user_id, 0):
+            counter.unread_count = unread.get(user_id, 0)
+    db.session.commit()
+    return len(user_ids)
+
+def ensure_unread_counters():
+    """Backfill unread counters for users that do not have one yet"""
+    missing = db.session.query(User.id).outerjoin(
+        UnreadCounter, UnreadCounter.user_id == User.id
+    ).filter(UnreadCounter.user_id.is_(None)).first()
+    if missing is not None:
+        count = rebuild_unread_counters()
+        print(f"✅ Rebuilt unread counters for {count} users")
+
+def rebuild_thread_roots():
+    """Backfill root_id on every lead comment by walking its parent chain"""
+    parents = dict(db.session.query(LeadComment.id, LeadComment.parent_comment_id).all())
+    stored = dict(db.session.query(LeadComment.id, LeadComment.root_id).all())
+    roots = {}
+
+    def root_of(comment_id):
+        chain = []
+        while comment_id not in roots and parents.get(comment_id) is not None and comment_id not in chain:
+            chain.append(comment_id)
+            comment_id = parents[comment_id]
+        root = roots.get(comment_id, comment_id)
+        for link in chain:
+            roots[link] = root
+        roots.setdefault(comment_id, root)
+        return root
+
+    changes = []
+    for comment_id in parents:
+        root_id = root_of(comment_id)
+        root_id = None if root_id == comment_id else root_id
+        if stored[comment_id] != root_id:
+            changes.append({'id': comment_id, 'root_id': root_id})
+    if changes:
+        db.session.execute(db.update(LeadComment), changes)
+    db.session.commit()
+    return len(changes)
+
+def add_missing_columns(table_name, columns):
+    """ALTER TABLE ADD COLUMN for columns added to a model after its table was created; create_all skips them"""
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table_name)}
+    for name, definition in columns.items():
+        if name not in existing:
+            with db.engine.begin() as connection:
+                connection.execute(db.text(f'ALTER TABLE {table_name} ADD COLUMN {name} {definition}'))
+            print(f"✅ Added {name} column to {table_name}")
+
+def ensure_lead_comment_schema():
+    """Add lead comment columns and indexes that create_all skips on existing tables, then backfill thread roots"""
+    add_missing_columns('lead_comments', {'root_id': 'INTEGER REFERENCES lead_comments(id)'})
+    for index in LeadComment.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+    unrooted = db.session.query(LeadComment.id).filter(
+        LeadComment.parent_comment_id.isnot(None), LeadComment.root_id.is_(None)
+    ).first()
+    if unrooted is not None:
+        count = rebuild_thread_roots()
+        print(f"✅ Backfilled thread roots for {count} lead comments")
+
+def link_responses_to_catalog():
+    """Backfill question_id/option_id on responses with set-based UPDATEs; returns the responses linked.
+
+    Question texts no questionnaire version contained are catalogued first, so every response gets a question id.
+    """
+    responses = QuestionnaireResponse.__table__
+    questions = QuestionnaireQuestion.__table__
+    options = QuestionnaireOption.__table__
+
+    uncatalogued = db.select(responses.c.question).where(
+        responses.c.question_id.is_(None),
+        responses.c.question.not_in(db.select(questions.c.text))
+    ).distinct()
+    db.session.execute(questions.insert().from_select(['text'], uncatalogued))
+
+    linked = db.session.execute(responses.update().where(responses.c.question_id.is_(None)).values(
+        question_id=db.select(questions.c.id).where(questions.c.text == responses.c.question).scalar_subquery(),
+        updated_at=responses.c.updated_at  # Linking is not an edit; keep score caches warm
+    )).rowcount
+    db.session.execute(responses.update().where(
+        responses.c.option_id.is_(None), responses.c.answer.isnot(None)
+    ).values(
+        option_id=db.select(options.c.id).where(
+            options.c.question_id == responses.c.question_id, options.c.label == responses.c.answer
+        ).scalar_subquery(),
+        updated_at=responses.c.updated_at
+    ))
+    db.session.commit()
+    return linked
+
+def ensure_response_schema():
+    """Add questionnaire response columns that create_all skips on existing tables"""
+    add_missing_columns('questionnaire_responses', {
+        'question_id': 'INTEGER REFERENCES questionnaire_questions(id)',
+        'option_id': 'INTEGER REFERENCES questionnaire_options(id)'
+    })
+
+def ensure_question_catalog():
+    """Add the response columns to existing databases, catalog the questionnaire and link unlinked responses"""
+    ensure_response_schema()
+    catalog = question_catalog.sync(current_questionnaire())
+    unlinked = db.session.query(QuestionnaireResponse.id).filter(QuestionnaireResponse.question_id.is_(None)).first()
+    if unlinked is not None:
+        count = link_responses_to_catalog()
+        print(f"✅ Linked {count} responses to the question catalog")
+    print(f"✅ Question catalog covers {len(catalog['question_ids'])} questions")
 
 # Database initialization
 def init_database():
@@ -523,6 +1432,28 @@ def init_database():
         except Exception as e:
             print(f"❌ Error initializing database: {e}")
 
+        # Columns and indexes added to lead_comments after the table was first created
+        try:
+            ensure_lead_comment_schema()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not update lead comment schema: {e}")
+
+        try:
+            ensure_question_catalog()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not sync question catalog: {e}")
+
+        # Backfill or refresh materialized assessment scores
+        try:
+            ensure_assessment_aggregates()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not rebuild assessment aggregates: {e}")
+
+        try:
+            ensure_unread_counters()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not rebuild unread counters: {e}")
+
         # Fix any existing naive datetime entries
         try:
             fix_naive_datetimes()
@@ -586,55 +1517,9 @@ def fix_naive_datetimes():
 
 def get_csv_score_for_answer(dimension, question, answer):
     """Get score from CSV for a specific dimension, question, and answer"""
-    # Try different file paths and encodings
-    possible_paths = [
-        'static/devweb.csv',
-        'devweb.csv',
-        os.path.join('static', 'devweb.csv'),
-        os.path.join(os.path.dirname(__file__), 'static', 'devweb.csv'),
-        os.path.join(os.path.dirname(__file__), 'devweb.csv')
-    ]
-    
-    possible_encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
-    
-    for file_path in possible_paths:
-        if os.path.exists(file_path):
-            for encoding in possible_encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        reader = csv.DictReader(f)
-                        current_dimension = None
-                        current_question = None
-                        
-                        for row in reader:
-                            try:
-                                dim = row.get('Dimensions', '').strip()
-                                q = row.get('Questions', '').strip()
-                                option = row.get('Options', '').strip()
-                                score_text = row.get('Scores', '').strip()
-                                
-                                if dim:
-                                    current_dimension = dim
-                                if q:
-                                    current_question = q
-                                    
-                                # Check if we found the right combination
-                                if (current_dimension == dimension and 
-                                    current_question == question and 
-                                    option == answer and score_text):
-                                    try:
-                                        return int(score_text)
-                                    except (ValueError, TypeError):
-                                        pass
-                            except Exception:
-                                continue
-                                        
-                    # If we got here, we successfully read the file but didn't find the answer
-                    break
-                except (UnicodeDecodeError, UnicodeError):
-                    continue
-            if encoding:
-                break
+    score = current_questionnaire()['scoring']['option_scores'].get((dimension, question, answer))
+    if score is not None:
+        return score
     
     # Default scoring based on option letter if CSV parsing fails
     if answer.startswith('A)'):
@@ -652,57 +1537,9 @@ def get_csv_score_for_answer(dimension, question, answer):
 
 def calculate_score_for_answer(question, answer):
     """Calculate score for a specific question-answer pair based on CSV data"""
-    # Try different file paths and encodings
-    possible_paths = [
-        'static/devweb.csv',
-        'devweb.csv',
-        os.path.join('static', 'devweb.csv'),
-        os.path.join(os.path.dirname(__file__), 'static', 'devweb.csv'),
-        os.path.join(os.path.dirname(__file__), 'devweb.csv')
-    ]
-    
-    possible_encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252', 'iso-8859-1']
-    
-    for file_path in possible_paths:
-        if os.path.exists(file_path):
-            for encoding in possible_encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        reader = csv.DictReader(f)
-                        current_question = None
-                        question_scores = {}
-
-                        for row in reader:
-                            try:
-                                q = row.get('Questions', '').strip()
-                                option = row.get('Options', '').strip()
-                                scores_text = row.get('Scores', '').strip()
-
-                                # Track current question
-                                if q:
-                                    current_question = q
-                                    question_scores = {}
-
-                                # Store score for each option of current question
-                                if current_question and option and scores_text:
-                                    try:
-                                        score = int(scores_text)
-                                        question_scores[option] = score
-                                    except (ValueError, TypeError):
-                                        pass
-
-                                # Check if we found a match for our question and answer
-                                if current_question == question and answer in question_scores:
-                                    return question_scores[answer] * 20  # Scale 1-5 to 20-100 scoring system
-                            except Exception:
-                                continue
-
-                    # If we got here, we successfully read the file but didn't find the answer
-                    break
-                except (UnicodeDecodeError, UnicodeError):
-                    continue
-            if encoding:
-                break
+    score = current_questionnaire()['scoring']['question_options'].get(question, {}).get(answer)
+    if score is not None:
+        return score * 20  # Scale 1-5 to 20-100 scoring system
 
     # Default scoring based on option letter if CSV parsing fails
     if answer.startswith('A)'):
@@ -726,67 +1563,142 @@ def calculate_score_for_answer(question, answer):
         else:
             return 25
 
-def calculate_dimension_scores(product_id, user_id):
-    """Calculate dimension-wise scores using the new logic: sum of option scores / total questions in dimension"""
-    try:
+def request_memo():
+    """Per-request memo of scoring and completeness results, stored on flask.g"""
+    if not has_app_context():
+        return None
+    if '_score_memo' not in g:
+        g._score_memo = {}
+    return g._score_memo
+
+def invalidate_request_memo(product_id, user_id):
+    """Forget memoized results for an assessment whose responses this request changed"""
+    memo = request_memo()
+    if memo:
+        for key in [key for key in memo if key[1:] == (product_id, user_id)]:
+            del memo[key]
+
+def score_assessment(product_id, user_id, responses=None):
+    """Score one assessment in a single pass over its responses.
+
+    Every answer is scored once and the same pass produces the dimension
+    averages, section percentages, maturity score and the ScoreHistory rows,
+    so routes no longer need separate queries for each view of the scores.
+    """
+    memo = request_memo() if responses is None else None
+    memo_key = ('assessment', product_id, user_id)
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+
+    if responses is None:
         responses = QuestionnaireResponse.query.filter_by(
             product_id=product_id, user_id=user_id
         ).all()
-        
-        # Group responses by dimension
-        dimension_data = {}
-        
-        for response in responses:
-            try:
-                dimension = response.section
-                if dimension not in dimension_data:
-                    dimension_data[dimension] = {
-                        'total_score': 0,
-                        'question_count': 0,
-                        'questions': []
-                    }
-                
-                # Get score from CSV
-                score = get_csv_score_for_answer(dimension, response.question, response.answer)
-                if score is not None and isinstance(score, (int, float)):
-                    dimension_data[dimension]['total_score'] += score
-                    dimension_data[dimension]['question_count'] += 1
-                    dimension_data[dimension]['questions'].append({
-                        'question': response.question,
-                        'answer': response.answer,
-                        'score': score
-                    })
-            except (TypeError, AttributeError):
-                continue
-        
-        # Calculate average score for each dimension
-        dimension_scores = {}
-        for dimension, data in dimension_data.items():
-            try:
-                if data['question_count'] > 0:
-                    avg_score = data['total_score'] / data['question_count']
-                    dimension_scores[dimension] = {
-                        'average_score': round(avg_score, 2),
-                        'total_score': data['total_score'],
-                        'question_count': data['question_count'],
-                        'questions': data['questions']
-                    }
-                else:
-                    dimension_scores[dimension] = {
-                        'average_score': 0,
-                        'total_score': 0,
-                        'question_count': 0,
-                        'questions': []
-                    }
-            except (TypeError, ZeroDivisionError):
-                dimension_scores[dimension] = {
-                    'average_score': 0,
-                    'total_score': 0,
-                    'question_count': 0,
-                    'questions': []
-                }
-        
-        return dimension_scores
+
+    questionnaire = current_questionnaire()
+    catalog = question_catalog.get(questionnaire) or EMPTY_CATALOG_SCORES
+    dimension_data = {}
+    section_scores = {}
+    section_max_scores = {}
+    section_counts = {}
+    response_scores = {}
+
+    for response in responses:
+        section = response.section
+        if section not in section_scores:
+            section_scores[section] = 0
+            section_max_scores[section] = 0
+            section_counts[section] = 0
+
+        # Stored score on the 20-100 scale; every presented question counts towards the max.
+        # Only unanswered (None) questions are skipped: an empty answer scores the defaults, 25 here and 1 below
+        option_score = catalog['option_scores'].get(response.option_id)
+        if option_score is not None:
+            scaled_score = option_score * 20
+        else:
+            scaled_score = calculate_score_for_answer(response.question, response.answer) if response.answer is not None else 0
+        response_scores[response.id] = scaled_score
+        section_scores[section] += scaled_score
+        section_max_scores[section] += 100  # Default max score per question
+        section_counts[section] += 1
+
+        if response.answer is None:
+            continue
+
+        # Maturity score on the 1-5 scale from the CSV
+        score = catalog['dimension_option_scores'].get((section, response.option_id))
+        if score is None:
+            score = get_csv_score_for_answer(section, response.question, response.answer)
+        if section not in dimension_data:
+            dimension_data[section] = {
+                'total_score': 0,
+                'question_count': 0,
+                'questions': []
+            }
+        dimension_data[section]['total_score'] += score
+        dimension_data[section]['question_count'] += 1
+        dimension_data[section]['questions'].append({
+            'question': response.question,
+            'answer': response.answer,
+            'score': score
+        })
+
+    # Average score for each dimension and percentage for each section
+    dimension_scores = {}
+    section_dimensions = {}
+    for dimension, data in dimension_data.items():
+        question_count = data['question_count']
+        max_possible_score = question_count * 5  # Assuming max score is 5
+        dimension_scores[dimension] = {
+            'average_score': round(data['total_score'] / question_count, 2),
+            'total_score': data['total_score'],
+            'question_count': question_count,
+            'questions': data['questions']
+        }
+        section_dimensions[dimension] = {
+            'total_score': data['total_score'],
+            'max_possible_score': max_possible_score,
+            'question_count': question_count,
+            'percentage': round((data['total_score'] / max_possible_score) * 100, 1),
+            'questions': data['questions']
+        }
+
+    score_history_rows = []
+    for section, total_score in section_scores.items():
+        max_score = section_max_scores[section]
+        score_history_rows.append({
+            'product_id': product_id,
+            'user_id': user_id,
+            'section_name': section,
+            'total_score': total_score,
+            'max_score': max_score,
+            'percentage': (total_score / max_score * 100) if max_score > 0 else 0,
+            'questions_answered': section_counts[section],
+            'questions_total': len(questionnaire['sections'].get(section, []))
+        })
+
+    assessment = {
+        'product_id': product_id,
+        'user_id': user_id,
+        'questionnaire_version': questionnaire['version'],
+        'responses': responses,
+        'completed_sections': set(section_scores),
+        'dimension_scores': dimension_scores,
+        'section_dimensions': section_dimensions,
+        'maturity_score': calculate_maturity_score(dimension_scores),
+        'section_scores': section_scores,
+        'section_max_scores': section_max_scores,
+        'response_scores': response_scores,
+        'score_history_rows': score_history_rows
+    }
+    if memo is not None:
+        memo[memo_key] = assessment
+    return assessment
+
+def calculate_dimension_scores(product_id, user_id):
+    """Calculate dimension-wise scores using the new logic: sum of option scores / total questions in dimension"""
+    try:
+        return score_assessment(product_id, user_id)['dimension_scores']
     except Exception:
         return {}
 
@@ -815,43 +1727,7 @@ def calculate_maturity_score(dimension_scores):
 def get_section_wise_dimensions(product_id, user_id):
     """Get dimension scores organized by section with detailed breakdown"""
     try:
-        responses = QuestionnaireResponse.query.filter_by(
-            product_id=product_id, user_id=user_id
-        ).all()
-        
-        section_dimensions = {}
-        
-        for response in responses:
-            section = response.section
-            if section not in section_dimensions:
-                section_dimensions[section] = {
-                    'total_score': 0,
-                    'max_possible_score': 0,
-                    'question_count': 0,
-                    'percentage': 0,
-                    'questions': []
-                }
-            
-            # Get score from CSV
-            score = get_csv_score_for_answer(section, response.question, response.answer)
-            if score is not None and isinstance(score, (int, float)):
-                section_dimensions[section]['total_score'] += score
-                section_dimensions[section]['max_possible_score'] += 5  # Assuming max score is 5
-                section_dimensions[section]['question_count'] += 1
-                section_dimensions[section]['questions'].append({
-                    'question': response.question,
-                    'answer': response.answer,
-                    'score': score
-                })
-        
-        # Calculate percentages
-        for section, data in section_dimensions.items():
-            if data['max_possible_score'] > 0:
-                data['percentage'] = round((data['total_score'] / data['max_possible_score']) * 100, 1)
-            else:
-                data['percentage'] = 0
-        
-        return section_dimensions
+        return score_assessment(product_id, user_id)['section_dimensions']
     except Exception:
         return {}
 
@@ -863,7 +1739,7 @@ def update_product_status(product_id, user_id):
         db.session.add(status_record)
 
     # Count total questions and answered questions
-    total_questions = sum(len(questions) for questions in QUESTIONNAIRE.values())
+    total_questions = current_questionnaire()['total_questions']
     answered_questions = QuestionnaireResponse.query.filter_by(
         product_id=product_id, user_id=user_id
     ).count()
@@ -906,58 +1782,259 @@ def update_product_status(product_id, user_id):
     db.session.commit()
     return status_record.status
 
-def calculate_and_store_scores(product_id, user_id):
+def calculate_and_store_scores(product_id, user_id, assessment=None):
     """Calculate scores for all sections and store in ScoreHistory"""
-    responses = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).all()
+    if assessment is None:
+        assessment = score_assessment(product_id, user_id)
 
-    section_scores = {}
-    section_max_scores = {}
-
-    # Calculate scores by section
-    for response in responses:
-        section = response.section
-        if section not in section_scores:
-            section_scores[section] = 0
-            section_max_scores[section] = 0
-
-        # Calculate score for this response
-        score = calculate_score_for_answer(response.question, response.answer)
+    for response in assessment['responses']:
         try:
-            response.score = score
+            response.score = assessment['response_scores'][response.id]
         except Exception:
             # If score column doesn't exist yet, skip setting it
             pass
-        section_scores[section] += score
-
-        # Calculate max possible score for this question
-        max_score = 100  # Default max score per question
-        section_max_scores[section] += max_score
 
-    # Store scores in ScoreHistory
-    for section, total_score in section_scores.items():
-        max_score = section_max_scores.get(section, 1)
-        percentage = (total_score / max_score * 100) if max_score > 0 else 0
+    # Replace the old score records for the scored sections
+    if assessment['score_history_rows']:
+        ScoreHistory.query.filter(
+            ScoreHistory.product_id == product_id,
+            ScoreHistory.user_id == user_id,
+            ScoreHistory.section_name.in_([row['section_name'] for row in assessment['score_history_rows']])
+        ).delete(synchronize_session=False)
 
-        # Remove old score record for this section
-        ScoreHistory.query.filter_by(
-            product_id=product_id, user_id=user_id, section_name=section
-        ).delete()
+    for row in assessment['score_history_rows']:
+        db.session.add(ScoreHistory(**row))
 
-        # Add new score record
-        score_record = ScoreHistory(
+    db.session.commit()
+    return assessment['section_scores']
+
+def aggregate_response_rows(rows):
+    """Group (product_id, user_id, section, question, answer, option_id) rows into per-dimension totals in one pass.
+
+    Accumulators live in flat arrays addressed by a (product, user, dimension)
+    group slot, so the whole input is scored in a single linear scan.
+    """
+    dimension_option_scores = (question_catalog.get(current_questionnaire()) or EMPTY_CATALOG_SCORES)['dimension_option_scores']
+    group_slots = {}
+    group_keys = []
+    score_sums = []
+    answer_counts = []
+    response_counts = []
+
+    for product_id, user_id, section, question, answer, option_id in rows:
+        key = (product_id, user_id, section)
+        slot = group_slots.get(key)
+        if slot is None:
+            slot = group_slots[key] = len(group_keys)
+            group_keys.append(key)
+            score_sums.append(0)
+            answer_counts.append(0)
+            response_counts.append(0)
+        response_counts[slot] += 1
+        if answer is not None:  # Empty answers count with the default score, as in score_assessment()
+            score = dimension_option_scores.get((section, option_id))
+            score_sums[slot] += score if score is not None else get_csv_score_for_answer(section, question, answer)
+            answer_counts[slot] += 1
+
+    totals = {}
+    for slot, key in enumerate(group_keys):
+        answer_count = answer_counts[slot]
+        totals[key] = {
+            'score_sum': score_sums[slot],
+            'answer_count': answer_count,
+            'response_count': response_counts[slot],
+            'max_score': answer_count * 5,
+            'maturity': round(score_sums[slot] / answer_count, 2) if answer_count else 0.0
+        }
+    return totals
+
+def write_assessment_aggregates(totals, existing_rows):
+    """Upsert aggregate rows from computed totals and drop rows whose dimension has no responses left"""
+    version = current_questionnaire()['version']
+    remaining = dict(totals)
+    for row in existing_rows:
+        values = remaining.pop((row.product_id, row.user_id, row.dimension), None)
+        if values is None:
+            db.session.delete(row)
+            continue
+        for field, value in values.items():
+            setattr(row, field, value)
+        row.questionnaire_version = version
+
+    for (product_id, user_id, dimension), values in remaining.items():
+        db.session.add(AssessmentAggregate(
             product_id=product_id,
             user_id=user_id,
-            section_name=section,
-            total_score=total_score,
-            max_score=max_score,
-            percentage=percentage
-        )
-        db.session.add(score_record)
+            dimension=dimension,
+            questionnaire_version=version,
+            **values
+        ))
+
+def response_score_columns():
+    return db.session.query(
+        QuestionnaireResponse.product_id,
+        QuestionnaireResponse.user_id,
+        QuestionnaireResponse.section,
+        QuestionnaireResponse.question,
+        QuestionnaireResponse.answer,
+        QuestionnaireResponse.option_id
+    )
 
+def refresh_assessment_aggregates(product_id, user_id):
+    """Recompute every stored aggregate row of one assessment.
+
+    All dimensions are rewritten, so the assessment never keeps rows stamped with
+    different questionnaire versions. Called inside the transaction that wrote the
+    responses; the caller commits.
+    """
+    invalidate_request_memo(product_id, user_id)
+    rows = response_score_columns().filter(
+        QuestionnaireResponse.product_id == product_id,
+        QuestionnaireResponse.user_id == user_id
+    ).all()
+    existing_rows = AssessmentAggregate.query.filter_by(product_id=product_id, user_id=user_id).all()
+    write_assessment_aggregates(aggregate_response_rows(rows), existing_rows)
+
+def rebuild_assessment_aggregates():
+    """Backfill every aggregate row from the raw responses"""
+    totals = aggregate_response_rows(response_score_columns().all())
+    write_assessment_aggregates(totals, AssessmentAggregate.query.all())
     db.session.commit()
-    return section_scores
+    return len(totals)
+
+def ensure_assessment_aggregates():
+    """Rebuild aggregates when they are missing or were computed against another questionnaire version"""
+    version = current_questionnaire()['version']
+    has_responses = db.session.query(QuestionnaireResponse.id).first() is not None
+    has_aggregates = db.session.query(AssessmentAggregate.id).first() is not None
+    is_stale = db.session.query(AssessmentAggregate.id).filter(
+        db.or_(AssessmentAggregate.questionnaire_version != version,
+               AssessmentAggregate.questionnaire_version.is_(None))
+    ).first() is not None
+    if (has_responses and not has_aggregates) or is_stale:
+        count = rebuild_assessment_aggregates()
+        print(f"✅ Rebuilt {count} assessment aggregates")
+
+class AssessmentAggregateSync:
+    """Rebuilds stale aggregates in bulk, once per process, when the questionnaire version changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+
+    def sync(self, questionnaire):
+        if self._version == questionnaire['version']:
+            return
+        with self._lock:
+            if self._version != questionnaire['version']:
+                ensure_assessment_aggregates()
+                self._version = questionnaire['version']
+
+assessment_aggregate_sync = AssessmentAggregateSync()
+
+@app.before_request
+def sync_assessment_aggregates():
+    """Restamp every aggregate for a new questionnaire version before any dashboard reads them"""
+    if request.endpoint == 'static':
+        return
+    try:
+        assessment_aggregate_sync.sync(current_questionnaire())
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Warning: Could not rebuild assessment aggregates: {e}")
+
+def assessment_scores_from_aggregates(rows):
+    """Build the dashboard view of an assessment's scores from its aggregate rows"""
+    dimension_scores = {}
+    section_dimensions = {}
+    for row in rows:
+        if not row.answer_count:
+            continue
+        dimension_scores[row.dimension] = {
+            'average_score': row.maturity,
+            'total_score': row.score_sum,
+            'question_count': row.answer_count
+        }
+        section_dimensions[row.dimension] = {
+            'total_score': row.score_sum,
+            'max_possible_score': row.max_score,
+            'question_count': row.answer_count,
+            'percentage': round((row.score_sum / row.max_score) * 100, 1) if row.max_score else 0
+        }
+    return {
+        'completed_sections': set(row.dimension for row in rows),
+        'response_count': sum(row.response_count for row in rows),
+        'dimension_scores': dimension_scores,
+        'section_dimensions': section_dimensions,
+        'maturity_score': calculate_maturity_score(dimension_scores)
+    }
+
+def load_assessment_scores(product_ids=None, user_id=None):
+    """Read materialized scores for many assessments with one indexed query.
+
+    Returns {(product_id, user_id): scores}. Aggregates are rebuilt in bulk when the
+    questionnaire version changes (sync_assessment_aggregates); an assessment still
+    stamped with another version, e.g. while a request pinned to the old snapshot
+    overlaps the rebuild, is rescored from its responses.
+    """
+    questionnaire = current_questionnaire()
+    query = AssessmentAggregate.query
+    if product_ids is not None:
+        if not product_ids:
+            return {}
+        query = query.filter(AssessmentAggregate.product_id.in_(product_ids))
+    if user_id is not None:
+        query = query.filter(AssessmentAggregate.user_id == user_id)
+
+    grouped = {}
+    for row in query.all():
+        grouped.setdefault((row.product_id, row.user_id), []).append(row)
+
+    section_order = {section: i for i, section in enumerate(questionnaire['section_ids'])}
+    assessment_scores = {}
+    for (product_id, owner_id), rows in grouped.items():
+        if any(row.questionnaire_version != questionnaire['version'] for row in rows):
+            assessment = score_assessment(product_id, owner_id)
+            assessment['response_count'] = len(assessment['responses'])
+            assessment_scores[(product_id, owner_id)] = assessment
+            continue
+        rows.sort(key=lambda row: section_order.get(row.dimension, len(section_order)))
+        assessment_scores[(product_id, owner_id)] = assessment_scores_from_aggregates(rows)
+    return assessment_scores
+
+def score_portfolio():
+    """Score every product from the materialized aggregates in one pass.
+
+    Returns {product_id: {'total_responses', 'maturity_score', 'dimension_scores'}}
+    for products that have responses.
+    """
+    section_count = len(current_questionnaire()['section_ids'])
+    portfolio = {}
+    for (product_id, user_id), scores in load_assessment_scores().items():
+        product_scores = portfolio.setdefault(product_id, {
+            'total_responses': 0,
+            'maturity_scores': [],
+            'dimension_scores': {}
+        })
+        product_scores['total_responses'] += scores['response_count']
+
+        # Only complete assessments contribute to the product maturity
+        if len(scores['completed_sections']) == section_count and scores['maturity_score'] > 0:
+            product_scores['maturity_scores'].append(scores['maturity_score'])
+
+        for dimension, data in scores['section_dimensions'].items():
+            display = product_scores['dimension_scores'].setdefault(dimension, {'total': 0, 'max': 0, 'count': 0})
+            display['total'] += data['total_score']
+            display['max'] += data['max_possible_score']
+            display['count'] += data['question_count']
+
+    for product_scores in portfolio.values():
+        for display in product_scores['dimension_scores'].values():
+            display['average'] = (display['total'] / display['max'] * 100) if display['max'] else 0
+        maturity_scores = product_scores.pop('maturity_scores')
+        product_scores['maturity_score'] = round(sum(maturity_scores) / len(maturity_scores)) if maturity_scores else 0
+
+    return portfolio
 
 def login_required(role=None):
     def decorator(f):
@@ -972,6 +2049,30 @@ def login_required(role=None):
         return decorated_function
     return decorator
 
+def conditional_json(stamp, build_payload):
+    """JSON response carrying an ETag, or 304 Not Modified when the client copy is current.
+
+    stamp must capture everything the payload depends on; build_payload only runs when it changed.
+    No Last-Modified is sent: it only has whole seconds, so a change within the second of the
+    client's copy, or a delete that lowers the newest timestamp, would still answer 304.
+    """
+    etag = hashlib.sha1(repr((request.path, session.get('user_id'), session.get('role'), stamp)).encode()).hexdigest()
+    not_modified = bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+    response = Response(status=304) if not_modified else jsonify(build_payload())
+    response.set_etag(etag, weak=True)
+    # Let browsers keep the copy but always revalidate it
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def lead_comment_stamp(*criteria):
+    """(row count, newest updated_at) of the lead comments matching criteria, as a cheap version stamp"""
+    return db.session.query(
+        db.func.count(LeadComment.id),
+        db.func.max(LeadComment.updated_at)
+    ).filter(*criteria).one()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -1099,88 +2200,122 @@ def logout():
     flash('Logged out successfully.')
     return redirect(url_for('index'))
 
+def load_client_products(user_id, section_ids):
+    """Load dashboard data for all of a client's products in a fixed number of queries.
+
+    Statuses, per-section response counts, rejection counts, stored scores and
+    materialized dimension scores are each fetched once for every product.
+    Nothing is written: products without a status record are shown as in progress.
+    """
+    products = Product.query.filter_by(owner_id=user_id).all()
+    if not products:
+        return []
+    product_ids = [product.id for product in products]
+
+    status_records = {}
+    for status_record in ProductStatus.query.filter(
+        ProductStatus.product_id.in_(product_ids),
+        ProductStatus.user_id == user_id
+    ).order_by(ProductStatus.id).all():
+        status_records.setdefault(status_record.product_id, status_record)
+
+    # Per-section counts of responses, reviewed responses and rejected responses
+    response_stats = {}
+    for product_id, section, response_count, reviewed_count, rejected_count in db.session.query(
+        QuestionnaireResponse.product_id,
+        QuestionnaireResponse.section,
+        db.func.count(QuestionnaireResponse.id),
+        db.func.sum(db.case((QuestionnaireResponse.is_reviewed == True, 1), else_=0)),
+        db.func.sum(db.case((QuestionnaireResponse.needs_client_response == True, 1), else_=0))
+    ).filter(
+        QuestionnaireResponse.product_id.in_(product_ids),
+        QuestionnaireResponse.user_id == user_id
+    ).group_by(QuestionnaireResponse.product_id, QuestionnaireResponse.section).all():
+        stats = response_stats.setdefault(product_id, {'sections': set(), 'responses': 0, 'reviewed': 0, 'rejected': 0})
+        stats['sections'].add(section)
+        stats['responses'] += response_count
+        stats['reviewed'] += reviewed_count or 0
+        stats['rejected'] += rejected_count or 0
+
+    stored_scores = {
+        product_id: (total_score or 0, max_score or 0)
+        for product_id, total_score, max_score in db.session.query(
+            ScoreHistory.product_id,
+            db.func.sum(ScoreHistory.total_score),
+            db.func.sum(ScoreHistory.max_score)
+        ).filter(
+            ScoreHistory.product_id.in_(product_ids),
+            ScoreHistory.user_id == user_id
+        ).group_by(ScoreHistory.product_id).all()
+    }
+
+    assessment_scores = load_assessment_scores(product_ids, user_id)
+
+    total_sections = len(section_ids)
+    products_with_status = []
+    for product in products:
+        status_record = status_records.get(product.id)
+        stats = response_stats.get(product.id, {'sections': set(), 'responses': 0, 'reviewed': 0, 'rejected': 0})
+        completed_sections = stats['sections']
+        completed_sections_count = len(completed_sections)
+        rejected_count = stats['rejected']
+
+        # If there are rejected questions, the assessment status should reflect this
+        status = status_record.status if status_record and status_record.status else 'in_progress'
+        if rejected_count > 0:
+            status = 'needs_client_response'
+        elif completed_sections_count == total_sections:
+            # Check if all questions are reviewed
+            if stats['reviewed'] == stats['responses']:
+                status = 'completed'
+            else:
+                status = 'under_review'
+
+        # Find next section to continue
+        next_section_idx = 0
+        for i, section in enumerate(section_ids):
+            if section not in completed_sections:
+                next_section_idx = i
+                break
+
+        # Dimension scores and maturity score from the materialized aggregates
+        scores = assessment_scores.get((product.id, user_id), {})
+
+        # Stored scores for backward compatibility
+        total_score, max_possible_score = stored_scores.get(product.id, (0, 0))
+        overall_percentage = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
+
+        products_with_status.append({
+            'id': product.id,
+            'name': product.name,
+            'owner_id': product.owner_id,
+            'status': status,
+            'status_display': status.replace('_', ' ').title(),
+            'completed_sections': completed_sections_count,
+            'total_sections': total_sections,
+            'next_section_idx': next_section_idx,
+            'progress_percentage': round((completed_sections_count / total_sections) * 100, 1) if total_sections else 0,
+            'answered_questions': status_record.questions_completed if status_record else 0,
+            'total_questions': status_record.total_questions if status_record else 0,
+            'overall_score': round(overall_percentage, 1),
+            'last_updated': status_record.last_updated if status_record else None,
+            'rejected_count': rejected_count,
+            'dimension_scores': scores.get('dimension_scores', {}),
+            'maturity_score': scores.get('maturity_score', 0),
+            'section_dimensions': scores.get('section_dimensions', {})
+        })
+
+    return products_with_status
+
 @app.route('/dashboard')
 @login_required()
+@query_budget(client=6, lead=3, superuser=5)
 def dashboard():
     role = session['role']
     user_id = session['user_id']
+    section_ids = current_questionnaire()['section_ids']
     if role == 'client':
-        products = Product.query.filter_by(owner_id=user_id).all()
-        # Check assessment completion for each product
-        products_with_status = []
-        for product in products:
-            # Get product status
-            status_record = ProductStatus.query.filter_by(product_id=product.id, user_id=user_id).first()
-            if not status_record:
-                # Create initial status record
-                status_record = ProductStatus(product_id=product.id, user_id=user_id)
-                db.session.add(status_record)
-                db.session.commit()
-
-            # Get responses and calculate progress
-            responses = QuestionnaireResponse.query.filter_by(product_id=product.id, user_id=user_id).all()
-            completed_sections = set([r.section for r in responses])
-            total_sections = len(SECTION_IDS)
-            completed_sections_count = len(completed_sections)
-
-            # Check for rejected questions that need client attention
-            rejected_responses = QuestionnaireResponse.query.filter_by(
-                product_id=product.id, user_id=user_id, needs_client_response=True
-            ).all()
-            rejected_count = len(rejected_responses)
-
-            # If there are rejected questions, the assessment status should reflect this
-            if rejected_count > 0:
-                status_record.status = 'needs_client_response'
-            elif completed_sections_count == total_sections and not rejected_count:
-                # Check if all questions are reviewed
-                all_reviewed = all(r.is_reviewed for r in responses)
-                if all_reviewed:
-                    status_record.status = 'completed'
-                else:
-                    status_record.status = 'under_review'
-
-            # Find next section to continue
-            next_section_idx = 0
-            for i, section in enumerate(SECTION_IDS):
-                if section not in completed_sections:
-                    next_section_idx = i
-                    break
-
-            # Calculate new dimension scores and maturity score
-            dimension_scores = calculate_dimension_scores(product.id, user_id)
-            maturity_score = calculate_maturity_score(dimension_scores)
-            section_dimensions = get_section_wise_dimensions(product.id, user_id)
-            
-            # Get latest scores for backward compatibility
-            latest_scores = ScoreHistory.query.filter_by(
-                product_id=product.id, user_id=user_id
-            ).order_by(ScoreHistory.calculated_at.desc()).all()
-
-            total_score = sum(score.total_score for score in latest_scores)
-            max_possible_score = sum(score.max_score for score in latest_scores)
-            overall_percentage = (total_score / max_possible_score * 100) if max_possible_score > 0 else 0
-
-            product_info = {
-                'id': product.id,
-                'name': product.name,
-                'owner_id': product.owner_id,
-                'status': status_record.status,
-                'status_display': status_record.status.replace('_', ' ').title(),
-                'completed_sections': completed_sections_count,
-                'total_sections': total_sections,
-                'next_section_idx': next_section_idx,
-                'progress_percentage': round((completed_sections_count / total_sections) * 100, 1),
-                'answered_questions': status_record.questions_completed,
-                'total_questions': status_record.total_questions,
-                'overall_score': round(overall_percentage, 1),
-                'last_updated': status_record.last_updated,
-                'rejected_count': rejected_count,
-                'dimension_scores': dimension_scores,
-                'maturity_score': maturity_score,
-                'section_dimensions': section_dimensions
-            }
-            products_with_status.append(product_info)
+        products_with_status = load_client_products(user_id, section_ids)
 
         # Get unread comments count for this client
         unread_comments = LeadComment.query.filter_by(client_id=user_id, is_read=False).count()
@@ -1197,36 +2332,38 @@ def dashboard():
         return render_template('dashboard_client.html', products=products_with_status, unread_comments=unread_comments, client_stats=client_stats)
     elif role == 'lead':
         # Get all responses with user and product information - only for completed assessments
+        complete = complete_assessments_query().subquery()
         resps = db.session.query(QuestionnaireResponse, User, Product).join(
+            complete, db.and_(
+                QuestionnaireResponse.product_id == complete.c.product_id,
+                QuestionnaireResponse.user_id == complete.c.user_id
+            )
+        ).join(
             User, QuestionnaireResponse.user_id == User.id
         ).join(
             Product, QuestionnaireResponse.product_id == Product.id
         ).all()
 
-        # Organize responses by client and product - filter for complete assessments only
+        assessment_scores = load_assessment_scores(list(set(product.id for _, _, product in resps)))
+
+        # Organize responses by client and product
         clients_data = {}
         for resp, user, product in resps:
-            # Check if this product's assessment is complete for this user
-            if not is_assessment_complete(product.id, user.id):
-                continue  # Skip incomplete assessments
-
             if user.id not in clients_data:
                 clients_data[user.id] = {
                     'user': user,
                     'products': {}
                 }
             if product.id not in clients_data[user.id]['products']:
-                # Calculate dimension scores and maturity score for this product
-                dimension_scores = calculate_dimension_scores(product.id, user.id)
-                maturity_score = calculate_maturity_score(dimension_scores)
-                section_dimensions = get_section_wise_dimensions(product.id, user.id)
+                # Dimension scores and maturity score from the materialized aggregates
+                assessment = assessment_scores.get((product.id, user.id), {})
                 
                 clients_data[user.id]['products'][product.id] = {
                     'product': product,
                     'responses': [],
-                    'dimension_scores': dimension_scores,
-                    'maturity_score': maturity_score,
-                    'section_dimensions': section_dimensions
+                    'dimension_scores': assessment.get('dimension_scores', {}),
+                    'maturity_score': assessment.get('maturity_score', 0),
+                    'section_dimensions': assessment.get('section_dimensions', {})
                 }
             clients_data[user.id]['products'][product.id]['responses'].append(resp)
 
@@ -1242,7 +2379,8 @@ def dashboard():
 
         return render_template('dashboard_lead.html', clients_data=clients_data, client_replies=client_replies)
     elif role == 'superuser':
-        products = Product.query.all()
+        products = Product.query.options(db.joinedload(Product.owner)).all()
+        portfolio = score_portfolio()
 
         # Get detailed product data with responses and scoring
         products_data = []
@@ -1250,69 +2388,21 @@ def dashboard():
         maturity_scores = []
         
         for product in products:
-            responses = QuestionnaireResponse.query.filter_by(product_id=product.id).all()
-            
-            if not responses:
+            product_scores = portfolio.get(product.id)
+            if not product_scores:
                 continue  # Skip products with no responses
-            
-            # Get product owner info
-            owner = User.query.get(product.owner_id)
-            
-            # Calculate proper dimension scores and maturity score for each user
-            users_with_responses = set([r.user_id for r in responses])
-            product_maturity_scores = []
-            
-            for user_id in users_with_responses:
-                # Check if this user's assessment is complete
-                if is_assessment_complete(product.id, user_id):
-                    dimension_scores = calculate_dimension_scores(product.id, user_id)
-                    maturity_score = calculate_maturity_score(dimension_scores)
-                    if maturity_score > 0:
-                        product_maturity_scores.append(maturity_score)
-            
-            # Use the average maturity score for this product
-            avg_maturity_score = sum(product_maturity_scores) / len(product_maturity_scores) if product_maturity_scores else 0
-            avg_maturity_score = round(avg_maturity_score)
-            
-            # Calculate simple dimension scores for display
-            dimension_scores = {}
-            for resp in responses:
-                if resp.section not in dimension_scores:
-                    dimension_scores[resp.section] = {'total': 0, 'count': 0}
-
-                # Simple scoring based on answer
-                score = 0
-                if 'yes' in resp.answer.lower() or 'high' in resp.answer.lower():
-                    score = 100
-                elif 'partially' in resp.answer.lower() or 'medium' in resp.answer.lower():
-                    score = 50
-                elif 'no' in resp.answer.lower() or 'low' in resp.answer.lower():
-                    score = 0
-                else:
-                    score = 25
-
-                dimension_scores[resp.section]['total'] += score
-                dimension_scores[resp.section]['count'] += 1
-
-            # Calculate average scores for each dimension
-            for dimension in dimension_scores:
-                if dimension_scores[dimension]['count'] > 0:
-                    dimension_scores[dimension]['average'] = dimension_scores[dimension]['total'] / dimension_scores[dimension]['count']
-                else:
-                    dimension_scores[dimension]['average'] = 0
 
             products_data.append({
                 'product': product,
-                'owner': owner,
-                'responses': responses,
-                'dimension_scores': dimension_scores,
-                'maturity_score': avg_maturity_score,
-                'total_responses': len(responses)
+                'owner': product.owner,
+                'dimension_scores': product_scores['dimension_scores'],
+                'maturity_score': product_scores['maturity_score'],
+                'total_responses': product_scores['total_responses']
             })
             
-            total_responses_count += len(responses)
-            if avg_maturity_score > 0:
-                maturity_scores.append(avg_maturity_score)
+            total_responses_count += product_scores['total_responses']
+            if product_scores['maturity_score'] > 0:
+                maturity_scores.append(product_scores['maturity_score'])
         
         # Calculate admin statistics
         admin_stats = {
@@ -1327,20 +2417,43 @@ def dashboard():
             User, QuestionnaireResponse.user_id == User.id
         ).join(
             Product, QuestionnaireResponse.product_id == Product.id
+        ).options(
+            db.selectinload(QuestionnaireResponse.lead_comments)
         ).order_by(QuestionnaireResponse.created_at.desc()).limit(100).all()
-        all_comments = LeadComment.query.options(db.joinedload(LeadComment.product), db.joinedload(LeadComment.lead), db.joinedload(LeadComment.client)).order_by(LeadComment.created_at.desc()).limit(50).all()
+        all_comments = LeadComment.query.options(db.joinedload(LeadComment.product), db.joinedload(LeadComment.lead), db.joinedload(LeadComment.client), db.joinedload(LeadComment.response)).order_by(LeadComment.created_at.desc()).limit(50).all()
 
         return render_template('dashboard_superuser.html', products_data=products_data, all_responses=all_responses, all_comments=all_comments, admin_stats=admin_stats)
     return redirect(url_for('index'))
 
+def complete_assessments_query():
+    """(product_id, user_id) pairs that answered every questionnaire section, as one GROUP BY"""
+    section_ids = current_questionnaire()['section_ids']
+    return db.session.query(
+        QuestionnaireResponse.product_id,
+        QuestionnaireResponse.user_id
+    ).filter(
+        QuestionnaireResponse.section.in_(section_ids)
+    ).group_by(
+        QuestionnaireResponse.product_id,
+        QuestionnaireResponse.user_id
+    ).having(
+        db.func.count(db.distinct(QuestionnaireResponse.section)) == len(section_ids)
+    )
+
 def is_assessment_complete(product_id, user_id):
     """Check if assessment is complete for a product"""
-    completed_sections = set([
-        r.section for r in QuestionnaireResponse.query.filter_by(
-            product_id=product_id, user_id=user_id
-        ).all()
-    ])
-    return len(completed_sections) == len(SECTION_IDS)
+    memo = request_memo()
+    memo_key = ('complete', product_id, user_id)
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+
+    is_complete = complete_assessments_query().filter(
+        QuestionnaireResponse.product_id == product_id,
+        QuestionnaireResponse.user_id == user_id
+    ).first() is not None
+    if memo is not None:
+        memo[memo_key] = is_complete
+    return is_complete
 
 @app.route('/add_product', methods=['GET', 'POST'])
 @login_required('client')
@@ -1384,12 +2497,14 @@ def add_product():
 @login_required('client')
 def fill_questionnaire_section(product_id, section_idx):
     product = Product.query.get_or_404(product_id)
-    sections = SECTION_IDS
+    questionnaire = current_questionnaire()
+    sections = questionnaire['section_ids']
     if section_idx >= len(sections):
         flash("All sections complete!")
         return redirect(url_for('dashboard'))
     section_name = sections[section_idx]
-    questions = QUESTIONNAIRE[section_name]
+    questions = questionnaire['sections'][section_name]
+    question_index = questionnaire['question_indexes'][section_name]
 
     # Get existing responses for this section to pre-populate form
     existing_responses = QuestionnaireResponse.query.filter_by(
@@ -1401,10 +2516,12 @@ def fill_questionnaire_section(product_id, section_idx):
     # Create a dictionary for quick lookup of existing responses
     existing_answers = {}
     for resp in existing_responses:
-        for i, q in enumerate(questions):
-            if q['question'] == resp.question:
-                existing_answers[i] = resp
-                break
+        i = question_index.get(resp.question)
+        if i is not None:
+            existing_answers[i] = resp
+
+    # Autosaved edits not submitted yet; shown in the form and promoted when it is submitted
+    drafts, draft_rows = section_drafts(product_id, session['user_id'], section_name, questions)
 
     if request.method == 'POST':
         # Get lead comments for validation
@@ -1415,27 +2532,22 @@ def fill_questionnaire_section(product_id, section_idx):
             for comment in comments:
                 lead_comments[comment.response_id] = comment
 
-        # Delete existing responses for this section before adding new ones (except approved ones)
-        responses_to_delete = []
-        for resp in existing_responses:
+        def is_approved(resp):
             lead_comment = lead_comments.get(resp.id)
-            if not lead_comment or lead_comment.status != 'approved':
-                responses_to_delete.append(resp.id)
-
-        if responses_to_delete:
-            QuestionnaireResponse.query.filter(QuestionnaireResponse.id.in_(responses_to_delete)).delete()
+            return lead_comment is not None and lead_comment.status == 'approved'
 
+        # Diff the submission against the stored rows: only changed answers are written, and ids stay stable
+        changed = False
         for i, q in enumerate(questions):
-            # Check if this question is approved
             existing_resp = existing_answers.get(i)
-            if existing_resp:
-                lead_comment = lead_comments.get(existing_resp.id)
-                if lead_comment and lead_comment.status == 'approved':
-                    # Keep the approved response as-is, don't update it
-                    continue
+            if existing_resp and is_approved(existing_resp):
+                # Keep the approved response as-is, don't update it
+                continue
 
-            answer = request.form.get(f'answer_{i}')
-            comment = request.form.get(f'comment_{i}')
+            # Fields the form does not carry fall back to the autosaved draft
+            draft = drafts.get(i)
+            answer = request.form.get(f'answer_{i}', draft.answer if draft else None)
+            comment = request.form.get(f'comment_{i}', draft.client_comment if draft else None)
             file = request.files.get(f'evidence_{i}')
             evidence_path = ""
 
@@ -1445,26 +2557,57 @@ def fill_questionnaire_section(product_id, section_idx):
                 filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
                 file.save(filepath)
                 evidence_path = filepath
-            elif i in existing_answers:
-                evidence_path = existing_answers[i].evidence_path or ''
-
-            resp = QuestionnaireResponse(
-                user_id=session['user_id'],
-                product_id=product_id,
-                section=section_name,
-                question=q['question'],
-                answer=answer,
-                client_comment=comment,
-                evidence_path=evidence_path,
-                is_reviewed=False,  # Reset review status for new/updated responses
-                needs_client_response=False  # Reset the client response flag when they respond
-            )
-            db.session.add(resp)
-        db.session.commit()
+            elif existing_resp:
+                evidence_path = existing_resp.evidence_path or ''
+
+            if existing_resp is None:
+                db.session.add(QuestionnaireResponse(
+                    user_id=session['user_id'],
+                    product_id=product_id,
+                    section=section_name,
+                    question=q['question'],
+                    question_index=i,
+                    answer=answer,
+                    client_comment=comment,
+                    evidence_path=evidence_path,
+                    is_reviewed=False,
+                    needs_client_response=False
+                ))
+                changed = True
+            elif ((existing_resp.answer or None) != (answer or None) or
+                  (existing_resp.client_comment or '') != (comment or '') or
+                  (existing_resp.evidence_path or '') != evidence_path):
+                existing_resp.question_index = i
+                existing_resp.answer = answer
+                existing_resp.client_comment = comment
+                existing_resp.evidence_path = evidence_path
+                existing_resp.is_reviewed = False  # Reset review status for updated responses
+                existing_resp.needs_client_response = False  # Reset the client response flag when they respond
+                changed = True
+
+        # Rows no question maps to any more (duplicates, questions dropped from the CSV), unless approved
+        # Deleted through the session so their lead comments go with them and the unread counters follow
+        kept_ids = {resp.id for resp in existing_answers.values()}
+        for resp in existing_responses:
+            if resp.id not in kept_ids and not is_approved(resp):
+                db.session.delete(resp)
+                changed = True
+
+        # The submitted values supersede every draft of the section
+        if draft_rows:
+            QuestionnaireDraft.query.filter(QuestionnaireDraft.id.in_([draft.id for draft in draft_rows])).delete(
+                synchronize_session=False)
+
+        if changed:
+            # Keep the materialized scores in step with the saved answers
+            refresh_assessment_aggregates(product_id, session['user_id'])
+        if changed or draft_rows:
+            db.session.commit()
 
         # Update product status and calculate scores
         status = update_product_status(product_id, session['user_id'])
-        calculate_and_store_scores(product_id, session['user_id'])
+        if changed:
+            calculate_and_store_scores(product_id, session['user_id'])
 
         if section_idx + 1 < len(sections):
             return redirect(url_for('fill_questionnaire_section', product_id=product_id, section_idx=section_idx+1))
@@ -1477,23 +2620,22 @@ def fill_questionnaire_section(product_id, section_idx):
                 flash("Section saved successfully!")
             return redirect(url_for('dashboard'))
 
-    completed_sections = [
-        s.section for s in QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=session['user_id']).distinct(QuestionnaireResponse.section)
-    ]
+    completed_sections = {
+        section for (section,) in db.session.query(QuestionnaireResponse.section).filter_by(
+            product_id=product_id, user_id=session['user_id']
+        ).distinct()
+    }
     progress = [(i, s, (s in completed_sections)) for i, s in enumerate(sections)]
 
     # Get review status for questions in this section
     question_review_status = {}
     if existing_responses:
-        response_ids = [resp.id for resp in existing_responses]
-        lead_comments = LeadComment.query.filter(LeadComment.response_id.in_(response_ids)).all()
+        response_questions = {resp.id: question_index.get(resp.question) for resp in existing_responses}
+        lead_comments = LeadComment.query.filter(LeadComment.response_id.in_(list(response_questions))).all()
         for comment in lead_comments:
-            for resp in existing_responses:
-                if resp.id == comment.response_id:
-                    for i, q in enumerate(questions):
-                        if q['question'] == resp.question:
-                            question_review_status[i] = comment.status
-                            break
+            i = response_questions.get(comment.response_id)
+            if i is not None:
+                question_review_status[i] = comment.status
 
     return render_template(
         'fill_questionnaire_section.html',
@@ -1504,20 +2646,152 @@ def fill_questionnaire_section(product_id, section_idx):
         total_sections=len(sections),
         progress=progress,
         existing_answers=existing_answers,
+        drafts=drafts,
         question_review_status=question_review_status
     )
 
+AUTOSAVE_MAX_CHANGES = 100
+
+def coalesce_autosave_changes(changes, questions):
+    """Merge a batch of autosave edits into {question index: {'answer'/'comment': value}}, last edit wins.
+
+    Returns (edits, error); keys a change leaves out are not touched.
+    """
+    if not isinstance(changes, list) or not changes:
+        return None, 'changes must be a non-empty list'
+    if len(changes) > AUTOSAVE_MAX_CHANGES:
+        return None, f'At most {AUTOSAVE_MAX_CHANGES} changes per request'
+
+    edits = {}
+    for change in changes:
+        index = change.get('index') if isinstance(change, dict) else None
+        if type(index) is not int or not 0 <= index < len(questions):
+            return None, 'Each change needs the index of a question in this section'
+        edit = edits.setdefault(index, {})
+        if 'answer' in change:
+            answer = change['answer'] or None
+            options = questions[index]['options']
+            if answer is not None and (answer not in options if options else
+                                       not isinstance(answer, str) or len(answer) > 500):
+                return None, f'Invalid answer for question {index}'
+            edit['answer'] = answer
+        if 'comment' in change:
+            comment = change['comment'] or ''
+            if not isinstance(comment, str):
+                return None, f'Comment for question {index} must be text'
+            edit['comment'] = comment
+    return edits, None
+
+def section_drafts(product_id, user_id, section_name, questions):
+    """(drafts by question index, every draft row of the section); drafts whose question moved are left out"""
+    rows = QuestionnaireDraft.query.filter_by(product_id=product_id, user_id=user_id, section=section_name).all()
+    drafts = {draft.question_index: draft for draft in rows
+              if draft.question_index < len(questions) and questions[draft.question_index]['question'] == draft.question}
+    return drafts, rows
+
+@app.route('/api/questionnaire/<int:product_id>/section/<int:section_idx>/autosave', methods=['POST'])
+@login_required('client')
+@query_budget(8)
+def autosave_questionnaire_section(product_id, section_idx):
+    """Save single answers and comments of a section as drafts.
+
+    JSON body: {"changes": [{"index": question index, "answer": option, "comment": text}, ...]}.
+    Drafts live in questionnaire_drafts, so submitted responses, scores, aggregates and product
+    status only change when the section form is submitted. Every batch is merged into the one
+    draft row per question, so overlapping or repeated saves coalesce and unchanged values
+    are not rewritten.
+    """
+    product = Product.query.get_or_404(product_id)
+    if product.owner_id != session['user_id']:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    questionnaire = current_questionnaire()
+    sections = questionnaire['section_ids']
+    if section_idx >= len(sections):
+        return jsonify({'error': 'Section not found'}), 404
+    section_name = sections[section_idx]
+    questions = questionnaire['sections'][section_name]
+
+    data = request.get_json(silent=True) or {}
+    edits, error = coalesce_autosave_changes(data.get('changes'), questions)
+    if error:
+        return jsonify({'error': error}), 400
+
+    drafts = {draft.question_index: draft for draft in QuestionnaireDraft.query.filter(
+        QuestionnaireDraft.product_id == product_id,
+        QuestionnaireDraft.user_id == session['user_id'],
+        QuestionnaireDraft.section == section_name,
+        QuestionnaireDraft.question_index.in_(list(edits))
+    )}
+
+    question_texts = [questions[i]['question'] for i in edits]
+    submitted = {}
+    for resp in QuestionnaireResponse.query.filter(
+        QuestionnaireResponse.product_id == product_id,
+        QuestionnaireResponse.user_id == session['user_id'],
+        QuestionnaireResponse.section == section_name,
+        QuestionnaireResponse.question.in_(question_texts)
+    ).order_by(QuestionnaireResponse.id):
+        submitted[resp.question] = resp  # Latest row wins, as in the section form
+
+    approved_ids = set()
+    if submitted:
+        approved_ids = {response_id for (response_id,) in db.session.query(LeadComment.response_id).filter(
+            LeadComment.response_id.in_([resp.id for resp in submitted.values()]),
+            LeadComment.status == 'approved'
+        )}
+
+    saved = []
+    locked = []
+    for i, edit in sorted(edits.items()):
+        question = questions[i]['question']
+        resp = submitted.get(question)
+        if resp is not None and resp.id in approved_ids:
+            # Approved responses are locked, as in the section form
+            locked.append(i)
+            continue
+
+        submitted_answer = (resp.answer or None) if resp else None
+        submitted_comment = (resp.client_comment or '') if resp else ''
+        draft = drafts.get(i)
+        if draft is not None and draft.question != question:
+            # Saved against a question the CSV has since moved; start over from the submitted values
+            draft.question, draft.answer, draft.client_comment = question, submitted_answer, submitted_comment
+        current_answer = draft.answer if draft else submitted_answer
+        current_comment = (draft.client_comment or '') if draft else submitted_comment
+        answer = edit.get('answer', current_answer)
+        comment = edit.get('comment', current_comment)
+
+        if answer == submitted_answer and comment == submitted_comment:
+            # Edited back to what was submitted: nothing left pending for this question
+            if draft is not None:
+                db.session.delete(draft)
+                saved.append(i)
+        elif draft is None:
+            db.session.add(QuestionnaireDraft(user_id=session['user_id'], product_id=product_id, section=section_name,
+                                              question_index=i, question=question, answer=answer, client_comment=comment))
+            saved.append(i)
+        elif answer != current_answer or comment != current_comment:
+            draft.answer = answer
+            draft.client_comment = comment
+            saved.append(i)
+
+    if saved:
+        db.session.commit()
+    return jsonify({'success': True, 'saved': saved, 'locked': locked})
+
 @app.route('/product/<int:product_id>/results')
 @login_required('client')
 def product_results(product_id):
-    resps = QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=session['user_id']).all()
+    # Score the assessment once; the raw responses come back with the result
+    assessment = score_assessment(product_id, session['user_id'])
+    resps = assessment['responses']
     # Get lead comments for this product
     lead_comments = LeadComment.query.options(db.joinedload(LeadComment.product), db.joinedload(LeadComment.lead)).filter_by(product_id=product_id, client_id=session['user_id']).order_by(LeadComment.created_at.desc()).all()
     
-    # Calculate dimension scores and maturity score
-    dimension_scores = calculate_dimension_scores(product_id, session['user_id'])
-    maturity_score = calculate_maturity_score(dimension_scores)
-    section_dimensions = get_section_wise_dimensions(product_id, session['user_id'])
+    dimension_scores = assessment['dimension_scores']
+    maturity_score = assessment['maturity_score']
+    section_dimensions = assessment['section_dimensions']
     
     # Calculate average dimension score
     if dimension_scores:
@@ -1558,11 +2832,81 @@ def product_results(product_id):
                          user_products=user_products,
                          average_dimension_score=average_dimension_score)
 
+INBOX_PAGE_SIZE = 20
+INBOX_EPOCH = datetime(1970, 1, 1)
+
+def encode_inbox_cursor(comment):
+    """Seek position just past a comment: created_at in microseconds and id"""
+    return f'{(comment.created_at - INBOX_EPOCH) // timedelta(microseconds=1)}-{comment.id}'
+
+def decode_inbox_cursor(cursor):
+    """(created_at, id) from an inbox cursor, or None if missing or malformed"""
+    try:
+        created_us, comment_id = (int(part) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return INBOX_EPOCH + timedelta(microseconds=created_us), comment_id
+
+def inbox_page(inbox_query, cursor):
+    """One newest-first page of an inbox by keyset on (created_at, id), plus the replies its threads show.
+
+    Returns (comments, thread_comments, next_cursor). The templates look replies up in
+    thread_comments, which holds the page and two levels of replies below it.
+    """
+    page_query = inbox_query.options(
+        db.joinedload(LeadComment.product),
+        db.joinedload(LeadComment.lead),
+        db.joinedload(LeadComment.client),
+        db.joinedload(LeadComment.response)
+    )
+    position = decode_inbox_cursor(cursor)
+    if position:
+        page_query = page_query.filter(db.tuple_(LeadComment.created_at, LeadComment.id) < position)
+    comments = page_query.order_by(LeadComment.created_at.desc(), LeadComment.id.desc()).limit(INBOX_PAGE_SIZE + 1).all()
+    next_cursor = encode_inbox_cursor(comments[INBOX_PAGE_SIZE - 1]) if len(comments) > INBOX_PAGE_SIZE else None
+    comments = comments[:INBOX_PAGE_SIZE]
+
+    thread_comments = list(comments)
+    seen = {comment.id for comment in comments}
+    parent_ids = list(seen)
+    for _ in range(2):
+        if not parent_ids:
+            break
+        replies = inbox_query.options(db.joinedload(LeadComment.lead), db.joinedload(LeadComment.client)).filter(
+            LeadComment.parent_comment_id.in_(parent_ids)
+        ).all()
+        parent_ids = [reply.id for reply in replies]
+        thread_comments.extend(reply for reply in replies if reply.id not in seen)
+        seen.update(parent_ids)
+    return comments, thread_comments, next_cursor
+
+def render_inbox(template, inbox_query):
+    """Render an inbox page starting at ?cursor=, numbering conversations from ?offset="""
+    comments, thread_comments, next_cursor = inbox_page(inbox_query, request.args.get('cursor'))
+    return render_template(template, comments=comments, thread_comments=thread_comments,
+                           next_cursor=next_cursor, page_offset=request.args.get('offset', 0, type=int))
+
+def inbox_page_json(template, inbox_query):
+    """Infinite-scroll page: the rendered conversation groups and the cursor for the next page"""
+    comments, thread_comments, next_cursor = inbox_page(inbox_query, request.args.get('cursor'))
+    html = render_template(template, comments=comments, thread_comments=thread_comments,
+                           page_offset=request.args.get('offset', 0, type=int))
+    return jsonify({'html': html, 'count': len(comments), 'next_cursor': next_cursor})
+
+def client_inbox_query(user_id):
+    return LeadComment.query.filter(LeadComment.client_id == user_id)
+
 @app.route('/client/comments')
 @login_required('client')
+@query_budget(3)
 def client_comments():
-    comments = LeadComment.query.options(db.joinedload(LeadComment.product), db.joinedload(LeadComment.lead)).filter_by(client_id=session['user_id']).order_by(LeadComment.created_at.desc()).all()
-    return render_template('client_comments.html', comments=comments)
+    return render_inbox('client_comments.html', client_inbox_query(session['user_id']))
+
+@app.route('/client/comments/page')
+@login_required('client')
+@query_budget(3)
+def client_comments_page():
+    return inbox_page_json('client_comment_groups.html', client_inbox_query(session['user_id']))
 
 @app.route('/client/comment/<int:comment_id>/read')
 @login_required('client')
@@ -1642,31 +2986,41 @@ def api_maturity_heatmap(product_id):
     if product.owner_id != session['user_id']:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Calculate dimension scores and maturity score
-    dimension_scores = calculate_dimension_scores(product_id, session['user_id'])
-    maturity_score = calculate_maturity_score(dimension_scores)
-    
-    # Prepare heatmap data
-    heatmap_data = {
-        'product_id': product_id,
-        'product_name': product.name,
-        'overall_maturity_score': maturity_score,
-        'overall_maturity_level': get_maturity_level_name(maturity_score),
-        'dimensions': []
-    }
-    
-    for dimension, score_data in dimension_scores.items():
-        level = round(score_data['average_score'])
-        heatmap_data['dimensions'].append({
-            'name': dimension,
-            'score': score_data['average_score'],
-            'level': level,
-            'level_name': get_maturity_level_name(level),
-            'question_count': score_data['question_count'],
-            'total_score': score_data['total_score']
-        })
-    
-    return jsonify(heatmap_data)
+    # Every answer change rewrites the assessment's aggregate rows, so they version the heatmap
+    count, last_updated = db.session.query(
+        db.func.count(AssessmentAggregate.id),
+        db.func.max(AssessmentAggregate.updated_at)
+    ).filter_by(product_id=product_id, user_id=session['user_id']).one()
+    stamp = (current_questionnaire()['version'], product.name, count, last_updated)
+
+    def build():
+        # Dimension scores and maturity score from the materialized aggregates
+        assessment = load_assessment_scores([product_id], session['user_id']).get((product_id, session['user_id']), {})
+        dimension_scores = assessment.get('dimension_scores', {})
+        maturity_score = assessment.get('maturity_score', 0)
+
+        # Prepare heatmap data
+        heatmap_data = {
+            'product_id': product_id,
+            'product_name': product.name,
+            'overall_maturity_score': maturity_score,
+            'overall_maturity_level': get_maturity_level_name(maturity_score),
+            'dimensions': []
+        }
+
+        for dimension, score_data in dimension_scores.items():
+            level = round(score_data['average_score'])
+            heatmap_data['dimensions'].append({
+                'name': dimension,
+                'score': score_data['average_score'],
+                'level': level,
+                'level_name': get_maturity_level_name(level),
+                'question_count': score_data['question_count'],
+                'total_score': score_data['total_score']
+            })
+        return heatmap_data
+
+    return conditional_json(stamp, build)
 
 def get_maturity_level_name(level):
     """Get the name for a maturity level"""
@@ -1680,27 +3034,21 @@ def get_maturity_level_name(level):
     }
     return level_names.get(level, 'Unknown')
 
+def lead_inbox_query(user_id):
+    # Client replies carry the lead_id of the comment they answer, so this covers them too
+    return LeadComment.query.filter(LeadComment.lead_id == user_id)
+
 @app.route('/lead/comments')
 @login_required('lead')
+@query_budget(3)
 def lead_comments():
-    # Get all comments where this lead is involved (either as the lead or where client replied)
-    comments = LeadComment.query.options(
-        db.joinedload(LeadComment.product),
-        db.joinedload(LeadComment.client),
-        db.joinedload(LeadComment.response)
-    ).filter(
-        db.or_(
-            LeadComment.lead_id == session['user_id'],
-            db.and_(
-                LeadComment.status == 'client_reply',
-                LeadComment.parent_comment_id.in_(
-                    db.session.query(LeadComment.id).filter_by(lead_id=session['user_id'])
-                )
-            )
-        )
-    ).order_by(LeadComment.created_at.desc()).all()
-    
-    return render_template('lead_comments.html', comments=comments)
+    return render_inbox('lead_comments.html', lead_inbox_query(session['user_id']))
+
+@app.route('/lead/comments/page')
+@login_required('lead')
+@query_budget(3)
+def lead_comments_page():
+    return inbox_page_json('lead_comment_groups.html', lead_inbox_query(session['user_id']))
 
 @app.route('/lead/comment/<int:comment_id>/reply', methods=['POST'])
 @login_required('lead')
@@ -1757,123 +3105,252 @@ def mark_client_reply_read(reply_id):
     if reply.lead_id != session['user_id'] or reply.status != 'client_reply':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Mark as read (we can add an is_read field to the model later if needed)
-    # For now, we'll just return success
+    reply.is_read = True
+    db.session.commit()
     return jsonify({'success': True})
 
+def chat_notification_criteria(user_role, user_id):
+    """Filter for the lead comments that notify this user, or None for roles without notifications"""
+    if user_role == 'client':
+        # Lead comments for this client
+        return (
+            LeadComment.client_id == user_id,
+            LeadComment.status.in_(CLIENT_NOTIFICATION_STATUSES)
+        )
+    if user_role == 'lead':
+        # Client replies for this lead
+        return (
+            LeadComment.lead_id == user_id,
+            LeadComment.status == 'client_reply'
+        )
+    return None
+
+def unread_message_count(user_id, criteria):
+    """Primary-key read of the maintained counter; counts the rows only for users without one"""
+    counter = db.session.get(UnreadCounter, user_id)
+    if counter is not None:
+        return counter.unread_count
+    return LeadComment.query.filter(*criteria).filter(LeadComment.is_read == False).count()
+
+def recent_chat_notifications(user_role, criteria, limit=5, after_id=None):
+    """Notification items for the newest matching comments, or for every comment after after_id"""
+    query = LeadComment.query.options(
+        db.joinedload(LeadComment.product),
+        db.joinedload(LeadComment.lead),
+        db.joinedload(LeadComment.client)
+    ).filter(*criteria)
+    if after_id is not None:
+        query = query.filter(LeadComment.id > after_id).order_by(LeadComment.id)
+    else:
+        query = query.order_by(LeadComment.created_at.desc())
+    return [chat_notification_item(comment, user_role) for comment in query.limit(limit).all()]
+
+def chat_notification_item(comment, user_role):
+    if user_role == 'client':
+        return {
+            'id': comment.id,
+            'type': 'lead_comment',
+            'message': f"Review from {comment.lead.username}",
+            'product': comment.product.name,
+            'status': comment.status,
+            'timestamp': comment.created_at.isoformat(),
+            'is_read': comment.is_read
+        }
+    return {
+        'id': comment.id,
+        'type': 'client_reply',
+        'message': f"Reply from {comment.client.username}",
+        'product': comment.product.name,
+        'timestamp': comment.created_at.isoformat(),
+        'is_read': getattr(comment, 'is_read', True)  # Default to read if field doesn't exist
+    }
+
 @app.route('/api/unread-messages')
 @login_required()
+@query_budget(1)
 def get_unread_messages():
     """Get count of unread messages for the current user"""
-    user_role = session['role']
     user_id = session['user_id']
-    
-    if user_role == 'client':
-        # Count unread lead comments for this client
-        unread_count = LeadComment.query.filter_by(
-            client_id=user_id, 
-            is_read=False
-        ).filter(
-            LeadComment.status.in_(['approved', 'needs_revision', 'rejected', 'lead_reply'])
-        ).count()
-    elif user_role == 'lead':
-        # Count unread client replies for this lead
-        unread_count = LeadComment.query.filter_by(
-            lead_id=user_id,
-            status='client_reply'
-        ).filter(
-            LeadComment.is_read == False
-        ).count()
-    else:
-        unread_count = 0
-    
-    return jsonify({'unread_count': unread_count})
+    criteria = chat_notification_criteria(session['role'], user_id)
+    if criteria is None:
+        return conditional_json(None, lambda: {'unread_count': 0})
+
+    unread_count = unread_message_count(user_id, criteria)
+    return conditional_json(unread_count, lambda: {'unread_count': unread_count})
 
 @app.route('/api/chat-notifications')
 @login_required()
+@query_budget(2)
 def get_chat_notifications():
     """Get recent chat notifications for the current user"""
     user_role = session['role']
+    criteria = chat_notification_criteria(user_role, session['user_id'])
+    if criteria is None:
+        return conditional_json(None, lambda: {'notifications': []})
+
+    count, last_updated = lead_comment_stamp(*criteria)
+    return conditional_json((count, last_updated),
+                            lambda: {'notifications': recent_chat_notifications(user_role, criteria)})
+
+SYNC_PAGE_SIZE = 100
+SYNC_OVERLAP_SECONDS = 5  # Re-send read changes this far back to cover writes that committed late
+
+def encode_sync_cursor(last_comment_id, changes_since):
+    return f'{last_comment_id}-{int(changes_since.timestamp() * 1000)}'
+
+def decode_sync_cursor(cursor):
+    """(last seen comment id, time read changes were last synced) from a cursor, or None if malformed"""
+    try:
+        last_comment_id, changes_since_ms = (int(part) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return last_comment_id, datetime.fromtimestamp(changes_since_ms / 1000, timezone.utc)
+
+@app.route('/api/notifications/sync')
+@login_required()
+@query_budget(3)
+def sync_notifications():
+    """Delta sync: comments newer than the cursor, read-state changes and the unread count in one response.
+
+    Without a cursor the latest notifications are returned along with a cursor to poll from.
+    Read changes are id/is_read snapshots and may repeat across polls.
+    """
+    user_role = session['role']
     user_id = session['user_id']
-    
-    notifications = []
-    
-    if user_role == 'client':
-        # Get recent lead comments for this client
-        recent_comments = LeadComment.query.options(
-            db.joinedload(LeadComment.product),
-            db.joinedload(LeadComment.lead)
-        ).filter_by(
-            client_id=user_id
-        ).filter(
-            LeadComment.status.in_(['approved', 'needs_revision', 'rejected', 'lead_reply'])
-        ).order_by(LeadComment.created_at.desc()).limit(5).all()
-        
-        for comment in recent_comments:
-            notifications.append({
-                'id': comment.id,
-                'type': 'lead_comment',
-                'message': f"Review from {comment.lead.username}",
-                'product': comment.product.name,
-                'status': comment.status,
-                'timestamp': comment.created_at.isoformat(),
-                'is_read': comment.is_read
-            })
-    
-    elif user_role == 'lead':
-        # Get recent client replies for this lead
-        recent_replies = LeadComment.query.options(
-            db.joinedload(LeadComment.product),
-            db.joinedload(LeadComment.client)
-        ).filter_by(
-            lead_id=user_id,
-            status='client_reply'
-        ).order_by(LeadComment.created_at.desc()).limit(5).all()
-        
-        for reply in recent_replies:
-            notifications.append({
-                'id': reply.id,
-                'type': 'client_reply',
-                'message': f"Reply from {reply.client.username}",
-                'product': reply.product.name,
-                'timestamp': reply.created_at.isoformat(),
-                'is_read': getattr(reply, 'is_read', True)  # Default to read if field doesn't exist
-            })
-    
-    return jsonify({'notifications': notifications})
+    criteria = chat_notification_criteria(user_role, user_id)
+    synced_at = datetime.now(timezone.utc)
+    if criteria is None:
+        return jsonify({'cursor': encode_sync_cursor(0, synced_at), 'notifications': [], 'read_changes': [],
+                        'unread_count': 0, 'has_more': False})
+
+    cursor = request.args.get('cursor')
+    if cursor is None:
+        notifications = recent_chat_notifications(user_role, criteria)
+        last_comment_id = db.session.query(db.func.max(LeadComment.id)).filter(*criteria).scalar() or 0
+        read_changes = []
+        has_more = False
+    else:
+        decoded = decode_sync_cursor(cursor)
+        if decoded is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        last_comment_id, changes_since = decoded
+
+        notifications = recent_chat_notifications(user_role, criteria, limit=SYNC_PAGE_SIZE + 1, after_id=last_comment_id)
+        has_more = len(notifications) > SYNC_PAGE_SIZE
+        notifications = notifications[:SYNC_PAGE_SIZE]
+        previous_comment_id = last_comment_id
+        if notifications:
+            last_comment_id = notifications[-1]['id']
+
+        # Comments the client already has whose row changed since the last sync
+        changed = db.session.query(LeadComment.id, LeadComment.is_read).filter(*criteria).filter(
+            LeadComment.id <= previous_comment_id,
+            LeadComment.updated_at >= changes_since - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        ).order_by(LeadComment.id).all()
+        read_changes = [{'id': comment_id, 'is_read': is_read} for comment_id, is_read in changed]
+
+    return jsonify({
+        'cursor': encode_sync_cursor(last_comment_id, synced_at),
+        'notifications': notifications,
+        'read_changes': read_changes,
+        'unread_count': unread_message_count(user_id, criteria),
+        'has_more': has_more
+    })
+
+def sse_message(event_name, data, event_id=None):
+    lines = [f'event: {event_name}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {app.json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+@app.route('/api/notifications/stream')
+@login_required()
+def notification_stream():
+    """Server-Sent Events stream of new chat notifications and unread counts for the current user.
+
+    Events arrive from the notification broker as comments are committed; the connection holds
+    no request context or DB session while idle, but does hold a worker thread on the threaded
+    server. Streams are therefore capped per process and per user: over the cap the client gets
+    204 and falls back to polling /api/notifications/sync. Reconnects with Last-Event-ID replay
+    missed comments.
+    """
+    user_role = session['role']
+    user_id = session['user_id']
+    criteria = chat_notification_criteria(user_role, user_id)
+    if criteria is None:
+        return Response(status=204)  # Tells EventSource not to reconnect
+
+    # Subscribe before reading the current state so nothing committed in between is lost
+    subscription = notification_broker.subscribe(user_id, app.config['SSE_MAX_STREAMS'],
+                                                  app.config['SSE_MAX_STREAMS_PER_USER'])
+    if subscription is None:
+        return Response(status=204)  # At the stream limit; the page polls the sync cursor instead
+    try:
+        opening = []
+        last_event_id = request.headers.get('Last-Event-ID', type=int)
+        if last_event_id is not None:
+            for item in recent_chat_notifications(user_role, criteria, limit=50, after_id=last_event_id):
+                opening.append(sse_message('notification', {'notification': item}, item['id']))
+        opening.append(sse_message('unread', {'unread_count': unread_message_count(user_id, criteria)}))
+    except Exception:
+        notification_broker.unsubscribe(user_id, subscription)
+        raise
+
+    def generate():
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            yield from opening
+            while True:
+                try:
+                    kind, comment_id = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+
+                with app.app_context():
+                    if kind == 'notification':
+                        items = recent_chat_notifications(user_role, criteria + (LeadComment.id == comment_id,), limit=1)
+                        for item in items:
+                            yield sse_message('notification', {'notification': item}, item['id'])
+                    yield sse_message('unread', {'unread_count': unread_message_count(user_id, criteria)})
+        finally:
+            notification_broker.unsubscribe(user_id, subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Keep reverse proxies from buffering the stream
+    })
 
 @app.route('/api/chat-thread/<int:comment_id>')
 @login_required()
+@query_budget(1)
 def get_chat_thread(comment_id):
     """Get full conversation thread for a comment"""
     user_role = session['role']
     user_id = session['user_id']
     
-    # Get the root comment
-    root_comment = LeadComment.query.get_or_404(comment_id)
+    # The whole conversation, at any depth, with its authors in one query
+    thread_comments = LeadComment.query.options(
+        db.joinedload(LeadComment.lead),
+        db.joinedload(LeadComment.client)
+    ).filter(thread_criteria(comment_id)).order_by(LeadComment.created_at.asc(), LeadComment.id.asc()).all()
+
+    requested_comment = next((comment for comment in thread_comments if comment.id == comment_id), None)
+    if requested_comment is None:
+        return jsonify({'error': 'Comment not found'}), 404
     
     # Check permissions
-    if user_role == 'client' and root_comment.client_id != user_id:
+    if user_role == 'client' and requested_comment.client_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
-    elif user_role == 'lead' and root_comment.lead_id != user_id:
+    elif user_role == 'lead' and requested_comment.lead_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Get all comments in this thread
-    thread_comments = LeadComment.query.options(
-        db.joinedload(LeadComment.lead),
-        db.joinedload(LeadComment.client),
-        db.joinedload(LeadComment.product)
-    ).filter(
-        db.or_(
-            LeadComment.id == comment_id,
-            LeadComment.parent_comment_id == comment_id
-        )
-    ).order_by(LeadComment.created_at.asc()).all()
-    
     thread_data = []
     for comment in thread_comments:
         thread_data.append({
             'id': comment.id,
+            'parent_comment_id': comment.parent_comment_id,
             'comment': comment.comment,
             'status': comment.status,
             'created_at': comment.created_at.isoformat(),
@@ -1887,42 +3364,68 @@ def get_chat_thread(comment_id):
     
     return jsonify({'thread': thread_data})
 
+MARK_READ_MAX_THREADS = 500
+
+def mark_comments_read(user_role, user_id, scope):
+    """Mark the user's unread notifications within scope read with one UPDATE.
+
+    Returns (marked count, new unread count). The bulk UPDATE skips the session's flush
+    hooks, so the unread counter and the SSE unread event are applied here instead.
+    """
+    criteria = chat_notification_criteria(user_role, user_id)
+    if criteria is None:
+        return 0, 0
+
+    marked = LeadComment.query.filter(*criteria, LeadComment.is_read == False, scope).update(
+        {LeadComment.is_read: True, LeadComment.updated_at: datetime.now(timezone.utc)},
+        synchronize_session=False
+    )
+    if marked:
+        unread_count = apply_unread_delta(db.session.connection(), user_id, -marked)
+        db.session.info.setdefault('chat_events', []).append((user_id, ('unread', None)))
+    else:
+        unread_count = unread_message_count(user_id, criteria)
+    db.session.commit()
+    return marked, unread_count
+
 @app.route('/api/mark-thread-read/<int:comment_id>', methods=['POST'])
 @login_required()
+@query_budget(2)
 def mark_thread_read(comment_id):
     """Mark all messages in a thread as read"""
-    user_role = session['role']
-    user_id = session['user_id']
-    
-    # Get all comments in thread
-    if user_role == 'client':
-        comments_to_mark = LeadComment.query.filter(
-            db.or_(
-                LeadComment.id == comment_id,
-                LeadComment.parent_comment_id == comment_id
-            )
-        ).filter(
-            LeadComment.client_id == user_id,
-            LeadComment.is_read == False
-        ).all()
-    else:
-        comments_to_mark = LeadComment.query.filter(
-            db.or_(
-                LeadComment.id == comment_id,
-                LeadComment.parent_comment_id == comment_id
-            )
-        ).filter(
-            LeadComment.lead_id == user_id,
-            LeadComment.status == 'client_reply',
-            LeadComment.is_read == False
-        ).all()
-    
-    for comment in comments_to_mark:
-        comment.is_read = True
-    
-    db.session.commit()
-    
-    return jsonify({'success': True, 'marked_count': len(comments_to_mark)})
+    marked, unread_count = mark_comments_read(session['role'], session['user_id'], thread_criteria(comment_id))
+    return jsonify({'success': True, 'marked_count': marked, 'unread_count': unread_count})
+
+@app.route('/api/mark-read', methods=['POST'])
+@login_required()
+@query_budget(2)
+def mark_read():
+    """Mark many threads and/or a whole product inbox read in one UPDATE.
+
+    JSON body: {"thread_ids": [comment ids, any comment of each thread], "product_id": id}
+    """
+    data = request.get_json(silent=True) or {}
+    thread_ids = data.get('thread_ids') or []
+    product_id = data.get('product_id')
+
+    # bool is an int subclass; JSON true/false are not comment ids
+    if not isinstance(thread_ids, list) or not all(type(thread_id) is int for thread_id in thread_ids):
+        return jsonify({'error': 'thread_ids must be a list of comment ids'}), 400
+    if len(thread_ids) > MARK_READ_MAX_THREADS:
+        return jsonify({'error': f'At most {MARK_READ_MAX_THREADS} threads per request'}), 400
+    if product_id is not None and type(product_id) is not int:
+        return jsonify({'error': 'product_id must be a product id'}), 400
+    if not thread_ids and product_id is None:
+        return jsonify({'error': 'Provide thread_ids or product_id'}), 400
+
+    scopes = []
+    if thread_ids:
+        scopes.append(thread_criteria(*thread_ids))
+    if product_id is not None:
+        scopes.append(LeadComment.product_id == product_id)
+
+    marked, unread_count = mark_comments_read(session['role'], session['user_id'], db.or_(*scopes))
+    return jsonify({'success': True, 'marked_count': marked, 'unread_count': unread_count})
 
 @app.route('/api/send-message', methods=['POST'])
 @login_required()
@@ -2077,6 +3580,7 @@ def review_questionnaire(response_id):
             # If is_reviewed column doesn't exist yet, skip setting it
             pass
 
+        refresh_assessment_aggregates(resp.product_id, resp.user_id)
         db.session.commit()
 
         # Update product status and recalculate scores
@@ -2171,6 +3675,7 @@ def admin_analytics():
 def admin_delete_product(product_id):
     product = Product.query.get_or_404(product_id)
     QuestionnaireResponse.query.filter_by(product_id=product_id).delete()
+    QuestionnaireDraft.query.filter_by(product_id=product_id).delete()
     db.session.delete(product)
     db.session.commit()
     flash('Product and all responses deleted.')
@@ -2178,89 +3683,43 @@ def admin_delete_product(product_id):
 
 @app.route('/api/product/<int:product_id>/scores')
 @login_required()
+@query_budget(2)
 def api_product_scores(product_id):
-    resps = QuestionnaireResponse.query.filter_by(product_id=product_id).all()
-    section_scores = {}
-    section_max_scores = {}
-    section_counts = {}
-    total_score = 0
-    total_max_score = 0
-    csv_map = {}
-
-    # Build scoring map from CSV
-    with open('devweb.csv', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        current_question = None
-        current_dimension = None
-        question_options = {}
-
-        for row in reader:
-            dimension = row['Dimensions'].strip()
-            question = row['Questions'].strip()
-            option = row['Options'].strip()
-            score_text = row.get('Scores', '').strip()
-
-            # Track current dimension and question
-            if dimension:
-                current_dimension = dimension
-            if question:
-                current_question = question
-                question_options = {}
-                if current_dimension not in section_max_scores:
-                    section_max_scores[current_dimension] = 0
-
-            # Store option and score for current question
-            if current_question and option and score_text:
-                try:
-                    score = int(score_text)
-                    question_options[option] = score
-                    csv_map[current_question] = question_options.copy()
-                except (ValueError, TypeError):
-                    pass
-
-        # Calculate max scores per section
-        for question, options in csv_map.items():
-            if options:
-                max_score = max(options.values())
-                # Find dimension for this question
-                for dimension in section_max_scores:
-                    if any(resp.question == question and resp.section == dimension for resp in resps):
-                        if section_max_scores[dimension] == 0:  # Only add once per question
-                            section_max_scores[dimension] += max_score
-                            total_max_score += max_score
-                        break
-
-    # Calculate actual scores
-    question_scores = {}
-    for r in resps:
-        sec = r.section
-        if sec not in section_scores:
-            section_scores[sec] = 0
-            section_counts[sec] = 0
-
-        score = csv_map.get(r.question, {}).get(r.answer, 0)
-        section_scores[sec] += score
-        section_counts[sec] += 1
-        total_score += score
-
-        # Store individual question scores
-        question_scores[f"{r.question}:{r.answer}"] = score
+    fingerprint = product_responses_fingerprint(product_id)
+
+    def build():
+        payload = product_scores_cache.get(product_id, fingerprint)
+        if payload is None:
+            resps = QuestionnaireResponse.query.filter_by(product_id=product_id).order_by(QuestionnaireResponse.id).all()
+            questionnaire = current_questionnaire()
+            payload = build_product_scores(resps, questionnaire['scoring'], question_catalog.get(questionnaire))
+            product_scores_cache.put(product_id, fingerprint, payload)
+        return payload
+
+    return conditional_json(fingerprint, build)
+
+def build_product_scores(resps, scoring, catalog=None):
+    """Chart payload of /api/product/<id>/scores"""
+    totals = score_product_responses(resps, scoring, catalog)
+    section_scores = totals['section_scores']
+    section_max_scores = totals['section_max_scores']
+    question_scores = {f"{r.question}:{r.answer}": score for r, score in zip(resps, totals['response_scores'])}
 
     # Calculate percentages
     section_labels = list(section_scores.keys())
-    section_values = [section_scores[k] for k in section_labels]
     section_percentages = []
-
     for section in section_labels:
         max_section_score = section_max_scores.get(section, 1)
         percentage = (section_scores[section] / max_section_score * 100) if max_section_score > 0 else 0
         section_percentages.append(round(percentage, 1))
 
+    total_score = totals['total_score']
+    total_max_score = totals['total_max_score']
     overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
 
-    return jsonify({
+    return {
         "section_labels": section_labels,
-        "section_scores": section_values,
+        "section_scores": [section_scores[k] for k in section_labels],
         "section_percentages": section_percentages,
         "section_max_scores": [section_max_scores.get(k, 0) for k in section_labels],
         "total_score": total_score,
@@ -2268,97 +3727,111 @@ def api_product_scores(product_id):
         "overall_percentage": round(overall_percentage, 1),
         "sections_count": len(section_labels),
         "question_scores": question_scores
-    })
-
-@app.route('/api/superuser/all_scores')
-@login_required('superuser')
-def api_all_scores():
-    products = Product.query.all()
-    all_scores = []
+    }
 
-    for product in products:
-        product_data = {}
-        resps = QuestionnaireResponse.query.filter_by(product_id=product.id).all()
+def score_product_responses(resps, scoring, catalog=None):
+    """Section scores and max scores of one product's responses, in a single pass.
 
-        if resps:
-            # Get scores for this product
-            section_scores = {}
-            section_max_scores = {}
-            total_score = 0
-            total_max_score = 0
-            csv_map = {}
-
-            # Build scoring map
-            with open('devweb.csv', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                current_question = None
-                current_dimension = None
-                question_options = {}
-
-                for row in reader:
-                    dimension = row['Dimensions'].strip()
-                    question = row['Questions'].strip()
-                    option = row['Options'].strip()
-                    score_text = row.get('Scores', '').strip()
-
-                    # Track current dimension and question
-                    if dimension:
-                        current_dimension = dimension
-                    if question:
-                        current_question = question
-                        question_options = {}
-                        if current_dimension not in section_max_scores:
-                            section_max_scores[current_dimension] = 0
-
-                    # Store option and score for current question
-                    if current_question and option and score_text:
-                        try:
-                            score = int(score_text)
-                            question_options[option] = score
-                            csv_map[current_question] = question_options.copy()
-                        except (ValueError, TypeError):
-                            pass
-
-                # Calculate max scores per section
-                for question, options in csv_map.items():
-                    if options:
-                        max_score = max(options.values())
-                        # Find dimension for this question
-                        for dimension in section_max_scores:
-                            if any(resp.question == question and resp.section == dimension for resp in resps):
-                                section_max_scores[dimension] += max_score
-                                total_max_score += max_score
-                                break
-
-            # Calculate scores
-            for r in resps:
-                sec = r.section
-                if sec not in section_scores:
-                    section_scores[sec] = 0
-
-                score = csv_map.get(r.question, {}).get(r.answer, 0)
-                section_scores[sec] += score
-                total_score += score
-
-            overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
-
-            # Get owner info
-            owner = User.query.get(product.owner_id)
-
-            product_data = {
-                'id': product.id,
-                'name': product.name,
-                'owner': owner.username if owner else 'Unknown',
-                'organization': owner.organization if owner else 'Unknown',
-                'total_score': total_score,
-                'max_score': total_max_score,
-                'percentage': round(overall_percentage, 1),
-                'section_scores': section_scores,
-                'section_percentages': {k: round((v / section_max_scores.get(k, 1) * 100), 1)
-                                       for k, v in section_scores.items()}
-            }
+    A question's max score counts once, towards the first dimension (CSV order) it was answered under.
+    Responses linked to the question catalog are scored and grouped by their integer ids.
+    """
+    catalog = catalog or EMPTY_CATALOG_SCORES
+    dimension_order = {dimension: i for i, dimension in enumerate(scoring['dimensions'])}
+    first_dimension = {}
+    question_max_scores = {}
+    section_scores = {}
+    response_scores = []
+    total_score = 0
+    for r in resps:
+        if r.question_id in catalog['max_scores']:
+            question, max_score = r.question_id, catalog['max_scores'][r.question_id]
         else:
-            product_data = {
+            question, max_score = r.question, scoring['max_scores'].get(r.question)
+        order = dimension_order.get(r.section)
+        if order is not None and max_score is not None:
+            if question not in first_dimension or order < dimension_order[first_dimension[question]]:
+                first_dimension[question] = r.section
+                question_max_scores[question] = max_score
+
+        score = catalog['option_scores'].get(r.option_id)
+        if score is None:
+            score = scoring['question_options'].get(r.question, {}).get(r.answer, 0)
+        section_scores[r.section] = section_scores.get(r.section, 0) + score
+        response_scores.append(score)
+        total_score += score
+
+    section_max_scores = {dimension: 0 for dimension in scoring['dimensions']}
+    for question, dimension in first_dimension.items():
+        section_max_scores[dimension] += question_max_scores[question]
+
+    return {
+        'section_scores': section_scores,
+        'section_max_scores': section_max_scores,
+        'response_scores': response_scores,
+        'total_score': total_score,
+        'total_max_score': sum(section_max_scores.values())
+    }
+
+class ProductScoresCache:
+    """LRU of /api/product/<id>/scores payloads, each stored with the response fingerprint it was built from"""
+
+    def __init__(self, max_size=1024):
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._entries = OrderedDict()  # product_id -> (fingerprint, payload)
+
+    def get(self, product_id, fingerprint):
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self._entries.move_to_end(product_id)
+            return entry[1]
+
+    def put(self, product_id, fingerprint, payload):
+        with self._lock:
+            self._entries[product_id] = (fingerprint, payload)
+            self._entries.move_to_end(product_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_id):
+        with self._lock:
+            self._entries.pop(product_id, None)
+
+product_scores_cache = ProductScoresCache()
+
+def product_responses_fingerprint(product_id):
+    """Cheap token that changes whenever a product's responses are added, edited or deleted"""
+    count, last_id, last_updated = db.session.query(
+        db.func.count(QuestionnaireResponse.id),
+        db.func.max(QuestionnaireResponse.id),
+        db.func.max(QuestionnaireResponse.updated_at)
+    ).filter(QuestionnaireResponse.product_id == product_id).one()
+    return (current_questionnaire()['version'], count, last_id, last_updated)
+
+ALL_SCORES_BATCH_SIZE = 200
+
+def score_product_batch(products, scoring, catalog=None):
+    """all_scores entries for a batch of products, scored from one response query"""
+    responses_by_product = {product.id: [] for product in products}
+    rows = db.session.query(
+        QuestionnaireResponse.product_id,
+        QuestionnaireResponse.section,
+        QuestionnaireResponse.question,
+        QuestionnaireResponse.question_id,
+        QuestionnaireResponse.answer,
+        QuestionnaireResponse.option_id
+    ).filter(
+        QuestionnaireResponse.product_id.in_(list(responses_by_product))
+    ).order_by(QuestionnaireResponse.id)
+    for row in rows:
+        responses_by_product[row.product_id].append(row)
+
+    for product in products:
+        resps = responses_by_product[product.id]
+        if not resps:
+            yield {
                 'id': product.id,
                 'name': product.name,
                 'owner': 'Unknown',
@@ -2369,10 +3842,93 @@ def api_all_scores():
                 'section_scores': {},
                 'section_percentages': {}
             }
+            continue
+
+        totals = score_product_responses(resps, scoring, catalog)
+        section_scores = totals['section_scores']
+        section_max_scores = totals['section_max_scores']
+        total_score = totals['total_score']
+        total_max_score = totals['total_max_score']
+
+        section_percentages = {}
+        for section, score in section_scores.items():
+            section_max = section_max_scores.get(section, 1)
+            section_percentages[section] = round(score / section_max * 100, 1) if section_max else 0
+
+        overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
+        owner = product.owner
+
+        yield {
+            'id': product.id,
+            'name': product.name,
+            'owner': owner.username if owner else 'Unknown',
+            'organization': owner.organization if owner else 'Unknown',
+            'total_score': total_score,
+            'max_score': total_max_score,
+            'percentage': round(overall_percentage, 1),
+            'section_scores': section_scores,
+            'section_percentages': section_percentages
+        }
 
-        all_scores.append(product_data)
-
-    return jsonify(all_scores)
+@app.route('/api/superuser/all_scores')
+@login_required('superuser')
+def api_all_scores():
+    """Portfolio scores as a streamed JSON array, in product id order.
+
+    ?cursor=<product id> starts after that product; ?limit=N returns one page and sets
+    X-Next-Cursor when more products follow. Without a limit every product is streamed.
+    """
+    cursor = request.args.get('cursor', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    questionnaire = current_questionnaire()
+    scoring = questionnaire['scoring']
+    catalog = question_catalog.get(questionnaire)
+    headers = {}
+
+    last_id = None
+    if limit is not None:
+        limit = max(1, limit)
+        page_ids = [row.id for row in db.session.query(Product.id).filter(
+            Product.id > cursor
+        ).order_by(Product.id).limit(limit + 1)]
+        if len(page_ids) > limit:
+            page_ids = page_ids[:limit]
+            headers['X-Next-Cursor'] = str(page_ids[-1])
+        last_id = page_ids[-1] if page_ids else cursor
+
+    def generate():
+        yield '['
+        after = cursor
+        first = True
+        while last_id is None or after < last_id:
+            query = Product.query.options(db.joinedload(Product.owner)).filter(Product.id > after)
+            if last_id is not None:
+                query = query.filter(Product.id <= last_id)
+            products = query.order_by(Product.id).limit(ALL_SCORES_BATCH_SIZE).all()
+            if not products:
+                break
+            for product_data in score_product_batch(products, scoring, catalog):
+                yield ('' if first else ',') + app.json.dumps(product_data)
+                first = False
+            after = products[-1].id
+            # Batches are independent; drop loaded products so memory stays flat
+            db.session.expunge_all()
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json', headers=headers)
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint for per-route request, DB and render histograms.
+
+    Served to logged-in superusers, or to scrapers sending the METRICS_TOKEN bearer token.
+    """
+    token = app.config.get('METRICS_TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    has_token = bool(token) and secrets.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not has_token and session.get('role') != 'superuser':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/admin/invite_user', methods=['GET', 'POST'])
 @login_required('superuser')
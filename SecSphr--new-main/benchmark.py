@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+SecureSphere Synthetic Load Benchmark
+Generates deterministic assessment data at increasing sizes and reports latency
+percentiles and SQL query counts for the role dashboards and score APIs.
+
+Usage: python3 benchmark.py [--sizes 5x2,20x5,50x10] [--iterations 20] [--seed 42] [--query-budget]
+
+Each size is CLIENTSxPRODUCTS: that many clients, each owning that many products
+with a fully answered questionnaire. The benchmark always runs against its own
+throwaway SQLite database, never the application database.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCHMARK_DB_PATH = os.path.join(tempfile.gettempdir(), 'securesphere_benchmark.db')
+
+# Point the app at the benchmark database before it is imported
+os.environ['DATABASE_URL'] = f'sqlite:///{BENCHMARK_DB_PATH}'
+
+from sqlalchemy import event
+from app import (app, db, User, Product, ProductStatus, QuestionnaireResponse, LeadComment,
+                 ScoreHistory, current_questionnaire, score_assessment, rebuild_assessment_aggregates,
+                 rebuild_unread_counters, ensure_question_catalog, assessment_aggregate_sync)
+
+REVIEW_STATUSES = ['approved', 'needs_revision', 'rejected']
+
+def reset_database():
+    """Drop and recreate every table in the benchmark database"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ensure_question_catalog()
+
+def generate_data(clients, products_per_client, seed):
+    """Create a deterministic data set and return the ids the scenarios need"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    with app.app_context():
+        questionnaire = current_questionnaire()
+        password_hash = None
+
+        def make_user(username, role):
+            nonlocal password_hash
+            user = User(username=username, email=f'{username}@bench.local', role=role,
+                        organization='Benchmark Inc.', first_login=False)
+            # Hashing is deliberately slow; reuse one hash for every synthetic user
+            if password_hash is None:
+                user.set_password('BenchPass123')
+                password_hash = user.password_hash
+            user.password_hash = password_hash
+            db.session.add(user)
+            return user
+
+        superuser = make_user('bench_admin', 'superuser')
+        leads = [make_user(f'bench_lead_{i}', 'lead') for i in range(max(1, clients // 5))]
+        client_users = [make_user(f'bench_client_{i}', 'client') for i in range(clients)]
+        db.session.flush()
+
+        products = []
+        for client in client_users:
+            for i in range(products_per_client):
+                product = Product(name=f'{client.username} product {i}', product_url='https://bench.local',
+                                  programming_language='Python', cloud_platform='AWS',
+                                  cicd_platform='GitHub Actions', owner_id=client.id)
+                db.session.add(product)
+                products.append(product)
+        db.session.flush()
+
+        responses = []
+        for product in products:
+            for section in questionnaire['section_ids']:
+                for index, question in enumerate(questionnaire['sections'][section]):
+                    response = QuestionnaireResponse(
+                        user_id=product.owner_id,
+                        product_id=product.id,
+                        section=section,
+                        question=question['question'],
+                        question_index=index,
+                        answer=rng.choice(question['options']) if question['options'] else None,
+                        client_comment='Synthetic answer',
+                        is_reviewed=rng.random() < 0.6,
+                        needs_client_response=rng.random() < 0.05,
+                        created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+                    )
+                    db.session.add(response)
+                    responses.append(response)
+            db.session.add(ProductStatus(product_id=product.id, user_id=product.owner_id,
+                                         status='under_review',
+                                         questions_completed=questionnaire['total_questions'],
+                                         total_questions=questionnaire['total_questions']))
+        db.session.flush()
+
+        # Review threads on roughly one response in six, with client and lead replies
+        comment_count = 0
+        for response in responses:
+            if rng.random() >= 1 / 6:
+                continue
+            lead = rng.choice(leads)
+            parent = LeadComment(response_id=response.id, lead_id=lead.id, client_id=response.user_id,
+                                 product_id=response.product_id, comment='Synthetic review',
+                                 status=rng.choice(REVIEW_STATUSES), is_read=rng.random() < 0.5,
+                                 created_at=response.created_at + timedelta(hours=1))
+            db.session.add(parent)
+            db.session.flush()
+            comment_count += 1
+            for depth in range(rng.randint(0, 3)):
+                from_client = depth % 2 == 0
+                reply = LeadComment(response_id=response.id, lead_id=lead.id, client_id=response.user_id,
+                                    product_id=response.product_id, comment='Synthetic reply',
+                                    status='client_reply' if from_client else 'lead_reply',
+                                    parent_comment_id=parent.id, is_read=rng.random() < 0.5,
+                                    created_at=parent.created_at + timedelta(hours=depth + 1))
+                db.session.add(reply)
+                db.session.flush()
+                parent = reply
+                comment_count += 1
+
+        for product in products:
+            for row in score_assessment(product.id, product.owner_id)['score_history_rows']:
+                db.session.add(ScoreHistory(**row))
+        db.session.commit()
+        rebuild_assessment_aggregates()
+        rebuild_unread_counters()
+        # The per-process version check would otherwise land on the first measured request
+        assessment_aggregate_sync.sync(questionnaire)
+
+        return {
+            'superuser': superuser.id,
+            'leads': [lead.id for lead in leads],
+            'clients': [client.id for client in client_users],
+            'products': [(product.id, product.owner_id) for product in products],
+            'responses': len(responses),
+            'comments': comment_count
+        }
+
+def section_form(section_idx, rng):
+    """Form payload answering every question in a section"""
+    questionnaire = current_questionnaire()
+    section = questionnaire['section_ids'][section_idx]
+    form = {}
+    for i, question in enumerate(questionnaire['sections'][section]):
+        if question['options']:
+            form[f'answer_{i}'] = rng.choice(question['options'])
+        form[f'comment_{i}'] = 'Benchmark update'
+    return form
+
+def build_scenarios(data, rng):
+    """Each scenario yields (role, user_id, method, url, request kwargs or None) for one iteration"""
+    def client_product():
+        product_id, owner_id = rng.choice(data['products'])
+        return product_id, owner_id
+
+    def product_scores():
+        product_id, owner_id = client_product()
+        return 'client', owner_id, 'get', f'/api/product/{product_id}/scores', None
+
+    def fill_get():
+        product_id, owner_id = client_product()
+        return 'client', owner_id, 'get', f'/fill_questionnaire/{product_id}/section/0', None
+
+    def fill_post():
+        product_id, owner_id = client_product()
+        with app.app_context():
+            form = section_form(0, rng)
+        return 'client', owner_id, 'post', f'/fill_questionnaire/{product_id}/section/0', {'data': form}
+
+    def autosave():
+        product_id, owner_id = client_product()
+        with app.app_context():
+            questions = current_questionnaire()['sections'][current_questionnaire()['section_ids'][0]]
+        index = rng.randrange(len(questions))
+        change = {'index': index, 'comment': f'Autosave {rng.random():.6f}'}
+        if questions[index]['options']:
+            change['answer'] = rng.choice(questions[index]['options'])
+        return 'client', owner_id, 'post', f'/api/questionnaire/{product_id}/section/0/autosave', {'json': {'changes': [change]}}
+
+    return [
+        ('dashboard', 'client', lambda: ('client', rng.choice(data['clients']), 'get', '/dashboard', None)),
+        ('dashboard', 'lead', lambda: ('lead', rng.choice(data['leads']), 'get', '/dashboard', None)),
+        ('dashboard', 'superuser', lambda: ('superuser', data['superuser'], 'get', '/dashboard', None)),
+        ('/api/superuser/all_scores', 'superuser',
+         lambda: ('superuser', data['superuser'], 'get', '/api/superuser/all_scores', None)),
+        ('/api/product/<id>/scores', 'client', product_scores),
+        ('fill_questionnaire_section GET', 'client', fill_get),
+        ('fill_questionnaire_section POST', 'client', fill_post),
+        ('section autosave', 'client', autosave),
+        ('/api/chat-notifications', 'client',
+         lambda: ('client', rng.choice(data['clients']), 'get', '/api/chat-notifications', None)),
+        ('/api/chat-notifications', 'lead',
+         lambda: ('lead', rng.choice(data['leads']), 'get', '/api/chat-notifications', None)),
+        ('/client/comments', 'client', lambda: ('client', rng.choice(data['clients']), 'get', '/client/comments', None)),
+        ('/lead/comments', 'lead', lambda: ('lead', rng.choice(data['leads']), 'get', '/lead/comments', None)),
+    ]
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def run_scenarios(data, iterations, seed):
+    """Time every scenario and count the SQL statements it issues"""
+    rng = random.Random(seed)
+    query_counter = [0]
+
+    def count_query(*args, **kwargs):
+        query_counter[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count_query)
+
+    # Failed requests are counted in the report rather than logged with tracebacks
+    app.logger.setLevel(logging.CRITICAL)
+
+    results = []
+    try:
+        for name, role, next_request in build_scenarios(data, rng):
+            latencies = []
+            queries = []
+            errors = 0
+            for _ in range(iterations):
+                session_role, user_id, method, url, body = next_request()
+                client = app.test_client()
+                with client.session_transaction() as sess:
+                    sess['user_id'] = user_id
+                    sess['role'] = session_role
+
+                query_counter[0] = 0
+                started = time.perf_counter()
+                response = getattr(client, method)(url, **(body or {}))
+                response.get_data()  # Drain streamed bodies inside the timed window
+                latencies.append((time.perf_counter() - started) * 1000)
+                queries.append(query_counter[0])
+                if response.status_code >= 400:
+                    errors += 1
+            results.append({
+                'endpoint': name,
+                'role': role,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'queries': max(queries),
+                'errors': errors
+            })
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_query)
+    return results
+
+def print_report(size_label, data, results):
+    print(f"\n📏 {size_label}: {len(data['clients'])} clients, {len(data['products'])} products, "
+          f"{data['responses']} responses, {data['comments']} comments")
+    print(f"{'endpoint':36} {'role':10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'errors':>7}")
+    for result in results:
+        print(f"{result['endpoint']:36} {result['role']:10} {result['p50']:9.1f} {result['p95']:9.1f} "
+              f"{result['p99']:9.1f} {result['queries']:8d} {result['errors']:7d}")
+
+def parse_sizes(value):
+    sizes = []
+    for item in value.split(','):
+        clients, products = item.lower().split('x')
+        sizes.append((int(clients), int(products)))
+    return sizes
+
+def main():
+    parser = argparse.ArgumentParser(description='SecureSphere synthetic load benchmark')
+    parser.add_argument('--sizes', default='5x2,20x5,50x10',
+                        help='comma-separated CLIENTSxPRODUCTS data sizes (default: 5x2,20x5,50x10)')
+    parser.add_argument('--iterations', type=int, default=20, help='requests per scenario (default: 20)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for data and request mix')
+    parser.add_argument('--query-budget', action='store_true',
+                        help='fail requests that exceed their declared query budget and print the offending queries')
+    args = parser.parse_args()
+
+    if args.query_budget:
+        app.config['QUERY_BUDGET_MODE'] = 'raise'
+
+    print("🚀 SecureSphere Benchmark")
+    print(f"🗄️  Database: {BENCHMARK_DB_PATH}")
+    print("=" * 95)
+
+    for clients, products_per_client in parse_sizes(args.sizes):
+        reset_database()
+        data = generate_data(clients, products_per_client, args.seed)
+        results = run_scenarios(data, args.iterations, args.seed)
+        print_report(f'{clients}x{products_per_client}', data, results)
+
+    print("=" * 95)
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
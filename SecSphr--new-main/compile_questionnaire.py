@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Questionnaire Build Script for SecureSphere
+Compiles devweb.csv into the binary artifact that app.py loads at startup.
+"""
+
+import sys
+from app import app, compile_questionnaire, write_questionnaire_artifact
+
+def build_questionnaire_artifact():
+    """Compile the questionnaire CSV and write the startup artifact"""
+    snapshot = compile_questionnaire(use_artifact=False)
+    if not snapshot['content_hash']:
+        print("❌ Questionnaire CSV not found; nothing to compile")
+        return False
+
+    artifact_path = app.config['QUESTIONNAIRE_ARTIFACT']
+    try:
+        write_questionnaire_artifact(snapshot, artifact_path)
+    except Exception as e:
+        print(f"❌ Error writing questionnaire artifact: {e}")
+        return False
+
+    print(f"✅ Compiled questionnaire version {snapshot['version']} "
+          f"({len(snapshot['section_ids'])} sections, {snapshot['total_questions']} questions)")
+    print(f"📦 Artifact written to: {artifact_path}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if build_questionnaire_artifact() else 1)
@@ -7,7 +7,7 @@ Creates a complete, persistent database with proper structure and sample data.
 import os
 import sys
 from datetime import datetime, timezone
-from app import app, db, User, Product, ProductStatus, QuestionnaireResponse, LeadComment, ScoreHistory, SystemSettings
+from app import app, db, User, Product, ProductStatus, QuestionnaireResponse, LeadComment, ScoreHistory, SystemSettings, ensure_assessment_aggregates, ensure_unread_counters, ensure_question_catalog
 
 def create_database():
     """Create all database tables"""
@@ -119,6 +119,45 @@ def create_system_settings():
             db.session.rollback()
             return False
 
+def create_question_catalog():
+    """Catalog the questionnaire's questions and options and link existing responses to them"""
+    print("Building question catalog...")
+    with app.app_context():
+        try:
+            ensure_question_catalog()
+            print("✅ Question catalog up to date")
+            return True
+        except Exception as e:
+            print(f"❌ Error building question catalog: {e}")
+            db.session.rollback()
+            return False
+
+def create_assessment_aggregates():
+    """Backfill materialized assessment scores from existing responses"""
+    print("Building assessment aggregates...")
+    with app.app_context():
+        try:
+            ensure_assessment_aggregates()
+            print("✅ Assessment aggregates up to date")
+            return True
+        except Exception as e:
+            print(f"❌ Error building assessment aggregates: {e}")
+            db.session.rollback()
+            return False
+
+def create_unread_counters():
+    """Backfill per-user unread message counters from existing lead comments"""
+    print("Building unread message counters...")
+    with app.app_context():
+        try:
+            ensure_unread_counters()
+            print("✅ Unread counters up to date")
+            return True
+        except Exception as e:
+            print(f"❌ Error building unread counters: {e}")
+            db.session.rollback()
+            return False
+
 def create_sample_products():
     """Skip sample products creation - products will be created by users"""
     print("Skipping sample products creation - products will be created by users")
@@ -137,8 +176,10 @@ def verify_database():
 
             expected_tables = [
                 'users', 'products', 'product_statuses',
+                'questionnaire_questions', 'questionnaire_options',
                 'questionnaire_responses', 'lead_comments',
-                'score_history', 'system_settings', 'invitation_tokens'
+                'score_history', 'assessment_aggregates', 'unread_counters',
+                'system_settings', 'invitation_tokens'
             ]
 
             for table in expected_tables:
@@ -217,6 +258,21 @@ def main():
         print("❌ Product creation failed")
         return False
 
+    # Catalog questions and link responses to them
+    if not create_question_catalog():
+        print("❌ Question catalog build failed")
+        return False
+
+    # Backfill assessment aggregates
+    if not create_assessment_aggregates():
+        print("❌ Assessment aggregate backfill failed")
+        return False
+
+    # Backfill unread message counters
+    if not create_unread_counters():
+        print("❌ Unread counter backfill failed")
+        return False
+
     # Verify database
     if not verify_database():
         print("❌ Database verification failed")
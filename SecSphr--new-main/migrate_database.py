@@ -6,7 +6,8 @@ Handles database schema updates safely.
 
 import sqlite3
 import os
-from app import app, db
+from app import (app, db, rebuild_assessment_aggregates, rebuild_unread_counters, ensure_lead_comment_schema,
+                 ensure_question_catalog)
 
 def migrate_database():
     """Apply all necessary database migrations"""
@@ -23,14 +24,17 @@ def migrate_database():
     cursor = conn.cursor()
 
     try:
-        # Migration 1: Add needs_client_response column to questionnaire_response table
-        try:
-            cursor.execute("SELECT needs_client_response FROM questionnaire_response LIMIT 1")
+        # Migration 1: Add needs_client_response column to questionnaire_responses table
+        cursor.execute("PRAGMA table_info(questionnaire_responses)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if not columns:
+            print("✓ questionnaire_responses table not created yet, create_tables() adds it")
+        elif 'needs_client_response' in columns:
             print("✓ needs_client_response column already exists")
-        except sqlite3.OperationalError:
-            print("Adding needs_client_response column to questionnaire_response table...")
+        else:
+            print("Adding needs_client_response column to questionnaire_responses table...")
             cursor.execute("""
-                ALTER TABLE questionnaire_response
+                ALTER TABLE questionnaire_responses
                 ADD COLUMN needs_client_response BOOLEAN DEFAULT 0
             """)
             print("✓ Added needs_client_response column")
@@ -53,11 +57,33 @@ def create_tables():
     with app.app_context():
         try:
             db.create_all()
-            print("✓ Database tables created/verified")
+            ensure_lead_comment_schema()
+            ensure_question_catalog()
+            print("✓ Database tables, columns and indexes created/verified")
         except Exception as e:
             print(f"❌ Error creating tables: {e}")
             raise
 
+def backfill_assessment_aggregates():
+    """Rebuild materialized assessment scores from the raw responses"""
+    with app.app_context():
+        try:
+            count = rebuild_assessment_aggregates()
+            print(f"✓ Rebuilt {count} assessment aggregates")
+        except Exception as e:
+            print(f"❌ Error rebuilding assessment aggregates: {e}")
+            raise
+
+def backfill_unread_counters():
+    """Recount every user's unread messages from lead_comments"""
+    with app.app_context():
+        try:
+            count = rebuild_unread_counters()
+            print(f"✓ Rebuilt unread counters for {count} users")
+        except Exception as e:
+            print(f"❌ Error rebuilding unread counters: {e}")
+            raise
+
 if __name__ == "__main__":
     print("Starting database migration...")
 
@@ -67,5 +93,7 @@ if __name__ == "__main__":
     # Run migrations
     migrate_database()
     create_tables()
+    backfill_assessment_aggregates()
+    backfill_unread_counters()
 
     print("✅ Database migration completed!")
\ No newline at end of file
@@ -5,7 +5,8 @@ SecureSphere Web Application Startup Script
 
 import os
 import sys
-from app import app, db, init_database
+from app import (app, db, init_database, ensure_assessment_aggregates, ensure_unread_counters,
+                 ensure_lead_comment_schema, ensure_question_catalog)
 
 def setup_and_run():
     """Setup database and run the webapp"""
@@ -17,6 +18,10 @@ def setup_and_run():
     with app.app_context():
         try:
             db.create_all()
+            ensure_lead_comment_schema()
+            ensure_question_catalog()
+            ensure_assessment_aggregates()
+            ensure_unread_counters()
             print("✅ Database initialized successfully")
         except Exception as e:
             print(f"❌ Database initialization error: {e}")
@@ -22,6 +22,14 @@ else
     exit 1
 fi
 
+# Compile the questionnaire for fast startup
+echo "🧩 Compiling questionnaire..."
+python3 compile_questionnaire.py
+
+if [ $? -ne 0 ]; then
+    echo "⚠️ Questionnaire could not be compiled; the app will read devweb.csv at startup"
+fi
+
 echo "🎉 Setup completed successfully!"
 echo "📝 To run your webapp, use: python3 run_webapp.py"
 echo "🔗 Or use: python3 app.py"
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Shared fixtures: a throwaway SQLite database, seeded users and a logged-in test client"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+TEST_DB_PATH = os.path.join(tempfile.gettempdir(), f'securesphere_test_{os.getpid()}.db')
+
+# Point the app at the test database before it is imported
+os.environ['DATABASE_URL'] = f'sqlite:///{TEST_DB_PATH}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as securesphere  # noqa: E402
+from app import app as flask_app, db, User, Product, QuestionnaireResponse, LeadComment  # noqa: E402
+
+@pytest.fixture
+def app():
+    """Fresh schema and question catalog for every test"""
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        securesphere.question_catalog._current = None
+        securesphere.assessment_aggregate_sync._version = None
+        securesphere.ensure_question_catalog()
+        yield flask_app
+        db.session.remove()
+
+@pytest.fixture
+def users(app):
+    """One user per role plus a second client; returns {name: id}"""
+    ids = {}
+    for name, role in [('admin', 'superuser'), ('client', 'client'), ('other_client', 'client'), ('lead', 'lead')]:
+        user = User(username=name, email=f'{name}@test.local', role=role, first_login=False)
+        user.password_hash = 'unused'
+        db.session.add(user)
+        db.session.flush()
+        ids[name] = user.id
+    db.session.commit()
+    return ids
+
+@pytest.fixture
+def login(app, users):
+    """login('client') -> test client with that user's session"""
+    roles = {'admin': 'superuser', 'client': 'client', 'other_client': 'client', 'lead': 'lead'}
+
+    def make_client(name):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = users[name]
+            sess['role'] = roles[name]
+        return client
+    return make_client
+
+@pytest.fixture
+def questionnaire(app):
+    return securesphere.current_questionnaire()
+
+def add_product(owner_id, name='Product'):
+    product = Product(name=name, product_url='https://test.local', programming_language='Python',
+                      cloud_platform='AWS', cicd_platform='GitHub Actions', owner_id=owner_id)
+    db.session.add(product)
+    db.session.commit()
+    return product.id
+
+def section_form(questionnaire, section_idx, choice=0):
+    """Form payload answering every question of a section with the option at position `choice`"""
+    questions = questionnaire['sections'][questionnaire['section_ids'][section_idx]]
+    form = {}
+    for i, question in enumerate(questions):
+        if question['options']:
+            form[f'answer_{i}'] = question['options'][choice % len(question['options'])]
+        form[f'comment_{i}'] = f'Comment {i}'
+    return form
+
+def submit_sections(client, questionnaire, product_id, section_indexes, choice=0):
+    for section_idx in section_indexes:
+        response = client.post(f'/fill_questionnaire/{product_id}/section/{section_idx}',
+                               data=section_form(questionnaire, section_idx, choice))
+        assert response.status_code == 302
+
+@pytest.fixture
+def reviewed_product(login, users, questionnaire):
+    """reviewed_product(count) -> (product_id, review comment ids): a submitted section with `count` unread reviews.
+
+    Reviews go through the lead's /review form, one per response. With `created_at(i)` they are
+    inserted directly on the first response instead, so a test can choose their timestamps.
+    """
+    def make_product(count, created_at=None):
+        product_id = add_product(users['client'])
+        submit_sections(login('client'), questionnaire, product_id, [0])
+        responses = QuestionnaireResponse.query.filter_by(product_id=product_id).order_by(QuestionnaireResponse.id)
+        if created_at is None:
+            lead = login('lead')
+            for resp in responses.limit(count):
+                assert lead.post(f'/review/{resp.id}', data={'lead_comment': 'Please clarify',
+                                                            'review_status': 'needs_revision'}).status_code == 302
+        else:
+            response_id = responses.first().id
+            for i in range(count):
+                db.session.add(LeadComment(response_id=response_id, lead_id=users['lead'], client_id=users['client'],
+                                           product_id=product_id, comment=f'Review {i}', status='needs_revision',
+                                           created_at=created_at(i)))
+            db.session.commit()
+        return product_id, [comment.id for comment in LeadComment.query.order_by(LeadComment.id)]
+    return make_product
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager counting the SQL statements issued inside it"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counter
+
+def response_rows(product_id, user_id):
+    return QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=user_id).all()
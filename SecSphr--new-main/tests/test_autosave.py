@@ -0,0 +1,147 @@
+"""Autosaved drafts stay out of submitted responses, scores and status until the section is submitted"""
+
+import pytest
+
+import app as securesphere
+from app import db, AssessmentAggregate, LeadComment, QuestionnaireDraft, QuestionnaireResponse
+
+from conftest import add_product, section_form, submit_sections, response_rows
+
+def autosave(client, product_id, section_idx, changes):
+    return client.post(f'/api/questionnaire/{product_id}/section/{section_idx}/autosave', json={'changes': changes})
+
+def other_option(questionnaire, section_idx, index, current):
+    options = questionnaire['sections'][questionnaire['section_ids'][section_idx]][index]['options']
+    return next(option for option in options if option != current)
+
+def snapshot(product_id, user_id):
+    return {
+        'responses': {(r.question, r.answer, r.client_comment, r.is_reviewed) for r in response_rows(product_id, user_id)},
+        'aggregates': {(a.dimension, a.score_sum, a.answer_count, a.maturity) for a in AssessmentAggregate.query.all()},
+        'complete': securesphere.is_assessment_complete(product_id, user_id),
+    }
+
+def test_autosave_alone_does_not_complete_a_section_or_change_scores(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    last = len(questionnaire['section_ids']) - 1
+    submit_sections(client, questionnaire, product_id, range(last))
+
+    before = snapshot(product_id, users['client'])
+    scores_before = client.get(f'/api/product/{product_id}/scores').get_json()
+
+    # Answer every question of the last section, but only through autosave
+    form = section_form(questionnaire, last)
+    questions = questionnaire['sections'][questionnaire['section_ids'][last]]
+    changes = [{'index': i, 'answer': form.get(f'answer_{i}'), 'comment': form[f'comment_{i}']}
+               for i in range(len(questions))]
+    response = autosave(client, product_id, last, changes)
+    assert response.status_code == 200
+    assert response.get_json()['saved'] == list(range(len(questions)))
+
+    db.session.expire_all()
+    assert snapshot(product_id, users['client']) == before
+    assert not before['complete']
+    assert client.get(f'/api/product/{product_id}/scores').get_json() == scores_before
+
+    # Submitting the section is what completes the assessment
+    submit_sections(client, questionnaire, product_id, [last])
+    db.session.expire_all()
+    assert securesphere.is_assessment_complete(product_id, users['client'])
+
+def test_autosave_leaves_reviewed_response_untouched(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    submit_sections(client, questionnaire, product_id, [0])
+    resp = QuestionnaireResponse.query.filter_by(product_id=product_id, question_index=0).one()
+    resp.is_reviewed = True
+    db.session.commit()
+    answer = resp.answer
+
+    new_answer = other_option(questionnaire, 0, 0, answer)
+    assert autosave(client, product_id, 0, [{'index': 0, 'answer': new_answer}]).status_code == 200
+
+    db.session.expire_all()
+    resp = db.session.get(QuestionnaireResponse, resp.id)
+    assert (resp.answer, resp.is_reviewed) == (answer, True)
+    draft = QuestionnaireDraft.query.one()
+    assert (draft.question_index, draft.answer, draft.client_comment) == (0, new_answer, 'Comment 0')
+
+def test_section_submit_promotes_drafts_and_clears_them(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    submit_sections(client, questionnaire, product_id, [0])
+    answer = QuestionnaireResponse.query.filter_by(product_id=product_id, question_index=0).one().answer
+    new_answer = other_option(questionnaire, 0, 0, answer)
+    autosave(client, product_id, 0, [{'index': 0, 'answer': new_answer, 'comment': 'Draft comment'}])
+
+    # The reopened form shows the draft
+    page = client.get(f'/fill_questionnaire/{product_id}/section/0').get_data(as_text=True)
+    assert 'Draft comment</textarea>' in page
+
+    # A form without the question's fields falls back to the draft
+    form = section_form(questionnaire, 0)
+    del form['answer_0'], form['comment_0']
+    assert client.post(f'/fill_questionnaire/{product_id}/section/0', data=form).status_code == 302
+
+    db.session.expire_all()
+    resp = QuestionnaireResponse.query.filter_by(product_id=product_id, question_index=0).one()
+    assert (resp.answer, resp.client_comment) == (new_answer, 'Draft comment')
+    assert QuestionnaireDraft.query.count() == 0
+
+def test_autosave_back_to_submitted_value_drops_the_draft(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    submit_sections(client, questionnaire, product_id, [0])
+    autosave(client, product_id, 0, [{'index': 1, 'comment': 'Changed'}])
+    assert QuestionnaireDraft.query.count() == 1
+
+    assert autosave(client, product_id, 0, [{'index': 1, 'comment': 'Comment 1'}]).get_json()['saved'] == [1]
+    assert QuestionnaireDraft.query.count() == 0
+
+def test_autosave_skips_approved_responses(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    submit_sections(client, questionnaire, product_id, [0])
+    resp = QuestionnaireResponse.query.filter_by(product_id=product_id, question_index=0).one()
+    db.session.add(LeadComment(response_id=resp.id, lead_id=users['lead'], client_id=users['client'],
+                               product_id=product_id, comment='Fine', status='approved'))
+    db.session.commit()
+
+    body = autosave(client, product_id, 0, [{'index': 0, 'comment': 'Late edit'}]).get_json()
+    assert (body['saved'], body['locked']) == ([], [0])
+    assert QuestionnaireDraft.query.count() == 0
+
+@pytest.mark.parametrize('changes', [
+    [],
+    [{'index': True, 'comment': 'x'}],
+    [{'index': 0, 'answer': 'Not an option'}],
+    [{'index': 0, 'comment': 5}],
+])
+def test_autosave_rejects_invalid_changes(login, users, changes):
+    client = login('client')
+    product_id = add_product(users['client'])
+    assert autosave(client, product_id, 0, changes).status_code == 400
+    assert QuestionnaireDraft.query.count() == 0
+
+def test_autosave_rejects_other_users_product(login, users):
+    product_id = add_product(users['client'])
+    assert autosave(login('other_client'), product_id, 0, [{'index': 0, 'comment': 'x'}]).status_code == 403
+
+def test_back_to_back_saves_are_merged_not_rejected(login, users, questionnaire):
+    client = login('client')
+    product_id = add_product(users['client'])
+    answer = questionnaire['sections'][questionnaire['section_ids'][0]][0]['options'][0]
+
+    # A debounced batch followed at once by the exit flush of the same page
+    assert autosave(client, product_id, 0, [{'index': 0, 'answer': answer}, {'index': 1, 'comment': 'first'}]).status_code == 200
+    response = autosave(client, product_id, 0, [{'index': 0, 'comment': 'second'}, {'index': 1, 'comment': 'last'}])
+    assert response.status_code == 200
+    assert response.get_json()['saved'] == [0, 1]
+
+    drafts = {draft.question_index: (draft.answer, draft.client_comment)
+              for draft in QuestionnaireDraft.query.order_by(QuestionnaireDraft.question_index)}
+    assert drafts == {0: (answer, 'second'), 1: (None, 'last')}
+
+    # Resending the same batch writes nothing
+    assert autosave(client, product_id, 0, [{'index': 1, 'comment': 'last'}]).get_json()['saved'] == []
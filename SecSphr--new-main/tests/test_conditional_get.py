@@ -0,0 +1,32 @@
+"""Polled JSON APIs revalidate by ETag, which sees changes within the same second"""
+
+from datetime import datetime, timedelta, timezone
+
+from werkzeug.http import http_date
+
+from app import db, LeadComment
+
+def now_header():
+    return http_date(datetime.now(timezone.utc) + timedelta(seconds=1))
+
+def test_chat_notifications_revalidate_by_etag(login, reviewed_product):
+    _, review_ids = reviewed_product(1)
+    client = login('client')
+    first = client.get('/api/chat-notifications')
+    assert first.status_code == 200 and first.headers.get('ETag')
+    assert 'Last-Modified' not in first.headers
+    assert client.get('/api/chat-notifications', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    # Edited in the same second the client's copy was built
+    db.session.get(LeadComment, review_ids[0]).comment = 'Edited'
+    db.session.commit()
+    again = client.get('/api/chat-notifications', headers={'If-None-Match': first.headers['ETag'],
+                                                           'If-Modified-Since': now_header()})
+    assert again.status_code == 200
+    assert again.headers['ETag'] != first.headers['ETag']
+
+def test_date_only_revalidation_is_never_answered_with_304(login, reviewed_product):
+    reviewed_product(1)
+    client = login('client')
+    client.get('/api/chat-notifications')
+    assert client.get('/api/chat-notifications', headers={'If-Modified-Since': now_header()}).status_code == 200
@@ -0,0 +1,52 @@
+"""Keyset pagination of the comment inboxes: no gaps, no duplicates, stable under timestamp ties"""
+
+from datetime import datetime, timedelta
+
+import app as securesphere
+
+PAGE = securesphere.INBOX_PAGE_SIZE
+
+START = datetime(2025, 1, 1, 12, 0, 0, 123456)
+
+def add_reviews(reviewed_product, count):
+    """`count` review comments for the client, newest first; every three share one created_at to force id tie-breaks"""
+    _, ids = reviewed_product(count, created_at=lambda i: START + timedelta(microseconds=i // 3))
+    return ids[::-1]
+
+def all_pages(query):
+    pages, cursor = [], None
+    while True:
+        comments, _, cursor = securesphere.inbox_page(query, cursor)
+        pages.append([comment.id for comment in comments])
+        if cursor is None:
+            return pages
+
+def test_pages_cover_every_comment_once_in_order(users, reviewed_product):
+    expected = add_reviews(reviewed_product, 2 * PAGE + 1)
+    pages = all_pages(securesphere.client_inbox_query(users['client']))
+    assert [len(page) for page in pages] == [PAGE, PAGE, 1]
+    assert [comment_id for page in pages for comment_id in page] == expected
+
+def test_exactly_one_full_page_has_no_next_cursor(users, reviewed_product):
+    expected = add_reviews(reviewed_product, PAGE)
+    assert all_pages(securesphere.client_inbox_query(users['client'])) == [expected]
+
+def test_malformed_cursor_starts_from_the_newest(users, reviewed_product):
+    expected = add_reviews(reviewed_product, 3)
+    for cursor in ('garbage', '12-', '-', ''):
+        comments, _, next_cursor = securesphere.inbox_page(securesphere.client_inbox_query(users['client']), cursor)
+        assert [comment.id for comment in comments] == expected
+        assert next_cursor is None
+
+def test_page_endpoint_follows_the_cursor_and_scopes_to_the_user(login, reviewed_product):
+    add_reviews(reviewed_product, PAGE + 5)
+    client = login('client')
+    first = client.get('/client/comments/page').get_json()
+    assert first['count'] == PAGE and first['next_cursor']
+    second = client.get(f"/client/comments/page?cursor={first['next_cursor']}&offset={PAGE}").get_json()
+    assert second['count'] == 5 and second['next_cursor'] is None
+    # The oldest review lands on the last page only
+    assert 'Review 0\n' not in first['html'] and 'Review 0\n' in second['html']
+
+    assert login('other_client').get('/client/comments/page').get_json()['count'] == 0
+    assert login('lead').get('/lead/comments/page').get_json()['count'] == PAGE
@@ -0,0 +1,44 @@
+"""POST /api/mark-read input validation and scoping"""
+
+import pytest
+
+from app import db, LeadComment
+
+@pytest.fixture
+def reviews(reviewed_product):
+    """Two unread review threads for the client on one product; returns the product id and their ids"""
+    return reviewed_product(2)
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'thread_ids': []},
+    {'thread_ids': 'all'},
+    {'thread_ids': [True]},
+    {'thread_ids': [1, False]},
+    {'thread_ids': ['1']},
+    {'product_id': True},
+    {'product_id': '1'},
+    {'thread_ids': list(range(1, 502))},
+])
+def test_rejects_invalid_bodies(login, reviews, body):
+    response = login('client').post('/api/mark-read', json=body)
+    assert response.status_code == 400
+    assert LeadComment.query.filter_by(is_read=False).count() == 2
+
+def test_marks_only_the_given_threads(login, reviews):
+    _, (first, second) = reviews
+    data = login('client').post('/api/mark-read', json={'thread_ids': [first]}).get_json()
+    assert data == {'success': True, 'marked_count': 1, 'unread_count': 1}
+    db.session.expire_all()
+    assert [c.is_read for c in LeadComment.query.order_by(LeadComment.id)] == [True, False]
+
+def test_marks_a_whole_product(login, reviews):
+    product_id, _ = reviews
+    data = login('client').post('/api/mark-read', json={'product_id': product_id}).get_json()
+    assert data['marked_count'] == 2 and data['unread_count'] == 0
+
+def test_other_users_cannot_mark_the_threads(login, reviews):
+    product_id, ids = reviews
+    data = login('other_client').post('/api/mark-read', json={'thread_ids': ids, 'product_id': product_id}).get_json()
+    assert data['marked_count'] == 0
+    assert LeadComment.query.filter_by(is_read=False).count() == 2
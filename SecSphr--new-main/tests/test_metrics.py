@@ -0,0 +1,13 @@
+"""/metrics is not public"""
+
+def test_metrics_requires_superuser_or_token(app, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', None)
+    assert app.test_client().get('/metrics').status_code == 401
+    assert login('client').get('/metrics').status_code == 401
+    assert login('admin').get('/metrics').status_code == 200
+
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scrape-secret')
+    assert app.test_client().get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = app.test_client().get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert b'securesphere_request_duration_seconds' in response.data
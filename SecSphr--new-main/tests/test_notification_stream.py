@@ -0,0 +1,54 @@
+"""Notification stream limits and the unread events it opens with"""
+
+import json
+
+import app as securesphere
+
+def read_opening_events(response):
+    """SSE messages up to and including the first unread event, then close the stream"""
+    events = []
+    try:
+        for chunk in response.response:
+            text = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if text.startswith('event: '):
+                name = text.split('\n', 1)[0][len('event: '):]
+                data = json.loads(text.rsplit('data: ', 1)[1])
+                events.append((name, data))
+                if name == 'unread':
+                    break
+    finally:
+        response.close()
+    return events
+
+def test_stream_opens_with_unread_count(login):
+    response = login('client').get('/api/notifications/stream', buffered=False)
+    assert response.status_code == 200
+    assert read_opening_events(response)[-1] == ('unread', {'unread_count': 0})
+
+def test_stream_over_the_per_user_cap_falls_back_to_204(app, login, users, monkeypatch):
+    monkeypatch.setitem(app.config, 'SSE_MAX_STREAMS_PER_USER', 1)
+    held = securesphere.notification_broker.subscribe(users['client'])
+    try:
+        assert login('client').get('/api/notifications/stream').status_code == 204
+        # Other users still get a stream
+        response = login('lead').get('/api/notifications/stream', buffered=False)
+        assert response.status_code == 200
+        response.close()
+    finally:
+        securesphere.notification_broker.unsubscribe(users['client'], held)
+
+def test_broker_releases_slots_on_unsubscribe():
+    broker = securesphere.NotificationBroker()
+    first = broker.subscribe(1, max_streams=1)
+    assert broker.subscribe(2, max_streams=1) is None
+    broker.unsubscribe(1, first)
+    broker.unsubscribe(1, first)  # Double unsubscribe must not free a second slot
+    assert broker.subscribe(2, max_streams=1) is not None
+    assert broker.subscribe(3, max_streams=1) is None
+
+def test_closed_stream_gives_its_slot_back(app, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'SSE_MAX_STREAMS_PER_USER', 1)
+    for _ in range(2):
+        response = login('client').get('/api/notifications/stream', buffered=False)
+        assert response.status_code == 200
+        read_opening_events(response)
@@ -0,0 +1,81 @@
+"""Maintained unread counters always equal a recount of lead_comments"""
+
+import app as securesphere
+from app import db, LeadComment, QuestionnaireResponse, UnreadCounter
+
+from conftest import submit_sections
+
+def true_unread_count(user_id):
+    return LeadComment.query.filter(securesphere.unread_comments_filter(user_id)).count()
+
+def assert_counters_match(users):
+    db.session.expire_all()
+    for user_id in users.values():
+        counter = db.session.get(UnreadCounter, user_id)
+        maintained = counter.unread_count if counter is not None else 0
+        assert maintained == true_unread_count(user_id), user_id
+
+def test_counters_follow_reviews_replies_and_reads(login, users, reviewed_product):
+    _, review_ids = reviewed_product(3)
+    assert_counters_match(users)
+    assert login('client').get('/api/unread-messages').get_json() == {'unread_count': 3}
+
+    # Client reply: unread for the lead
+    response = login('client').post('/api/send-message', json={'parent_comment_id': review_ids[0], 'message': 'Done'})
+    assert response.status_code == 200
+    assert_counters_match(users)
+    assert login('lead').get('/api/unread-messages').get_json() == {'unread_count': 1}
+
+    # Single read, thread read and bulk read all go through the counter
+    login('client').get(f'/client/comment/{review_ids[0]}/read')
+    assert_counters_match(users)
+    login('client').post(f'/api/mark-thread-read/{review_ids[1]}')
+    assert_counters_match(users)
+    data = login('lead').post('/api/mark-read', json={'thread_ids': [review_ids[0]]}).get_json()
+    assert data['unread_count'] == 0
+    assert_counters_match(users)
+
+def test_counters_follow_edits_and_deletes(users, reviewed_product):
+    _, review_ids = reviewed_product(3)
+
+    # A status change can move a comment between recipients
+    comment = db.session.get(LeadComment, review_ids[0])
+    comment.status = 'client_reply'
+    db.session.commit()
+    assert_counters_match(users)
+
+    db.session.delete(db.session.get(LeadComment, review_ids[1]))
+    db.session.commit()
+    assert_counters_match(users)
+
+    comment = db.session.get(LeadComment, review_ids[2])
+    comment.is_read = True
+    db.session.commit()
+    assert_counters_match(users)
+
+def test_rebuild_agrees_with_maintained_counters(reviewed_product):
+    reviewed_product(3)
+    maintained = {counter.user_id: counter.unread_count for counter in UnreadCounter.query}
+
+    UnreadCounter.query.delete()
+    db.session.commit()
+    securesphere.rebuild_unread_counters()
+    rebuilt = {counter.user_id: counter.unread_count for counter in UnreadCounter.query if counter.unread_count}
+    assert rebuilt == {user_id: count for user_id, count in maintained.items() if count}
+
+def test_resubmit_deletes_comments_of_stale_responses(login, users, questionnaire, reviewed_product):
+    _, review_ids = reviewed_product(1)
+    reviewed = db.session.get(LeadComment, review_ids[0]).response
+
+    # A newer duplicate row takes over the question, leaving the reviewed row stale
+    db.session.add(QuestionnaireResponse(user_id=reviewed.user_id, product_id=reviewed.product_id,
+                                         section=reviewed.section, question=reviewed.question,
+                                         question_index=reviewed.question_index, answer=reviewed.answer))
+    db.session.commit()
+    assert login('client').get('/api/unread-messages').get_json() == {'unread_count': 1}
+
+    submit_sections(login('client'), questionnaire, reviewed.product_id, [0], choice=1)
+    db.session.expire_all()
+    assert LeadComment.query.count() == 0
+    assert_counters_match(users)
+    assert login('client').get('/api/unread-messages').get_json() == {'unread_count': 0}